@@ -0,0 +1,142 @@
+from __future__ import annotations
+import json
+import math
+import os
+import re
+import subprocess
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Expected log-log slope of *total* runtime / peak memory vs stream length n
+# for a documented per-tick time or space class. Window size k is fixed, so O(k) ~ O(1).
+_TIME_EXPONENT = {"1": 1.0, "k": 1.0, "n": 2.0}
+_SPACE_EXPONENT = {"1": 0.0, "k": 0.0, "n": 1.0}
+_TIME_RE = re.compile(r"Time per tick:\s*O\(([^)]*)\)")
+_SPACE_RE = re.compile(r"Space:\s*O\(([^)]*)\)")
+
+# Peak memory below this is treated as constant noise (interpreter/allocator jitter).
+MEM_FLOOR_BYTES = 4096
+
+def geometric_sizes(start: int = 1_000, factor: int = 2, count: int = 6) -> List[int]:
+    return [start * factor ** i for i in range(count)]
+
+def documented_complexity(strategy_cls: type) -> Dict[str, Optional[str]]:
+    """
+    Read the 'Time per tick: O(..)' and 'Space: O(..)' annotations from a strategy docstring.
+    """
+    doc = strategy_cls.__doc__ or ""
+    t = _TIME_RE.search(doc)
+    s = _SPACE_RE.search(doc)
+    return {"time": t.group(1).strip() if t else None, "space": s.group(1).strip() if s else None}
+
+def fit_exponent(xs: Iterable[float], ys: Iterable[float]) -> Tuple[float, float]:
+    """
+    Least-squares fit of log(y) = b * log(x) + a.
+    Returns (b, r^2). b is the empirical exponent.
+    """
+    lx = [math.log(x) for x in xs]
+    ly = [math.log(y) for y in ys]
+    n = len(lx)
+    if n < 2:
+        return float("nan"), float("nan")
+    mx = sum(lx) / n
+    my = sum(ly) / n
+    sxx = sum((x - mx) ** 2 for x in lx)
+    sxy = sum((x - mx) * (y - my) for x, y in zip(lx, ly))
+    syy = sum((y - my) ** 2 for y in ly)
+    if sxx == 0:
+        return float("nan"), float("nan")
+    b = sxy / sxx
+    r2 = (sxy * sxy) / (sxx * syy) if syy > 0 else 1.0
+    return b, r2
+
+def fit_scaling(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """
+    Fit time and memory exponents per strategy from run_benchmarks rows.
+    """
+    fits: Dict[str, Dict[str, float]] = {}
+    for name in sorted(set(r["strategy"] for r in results)):
+        rows = sorted((r for r in results if r["strategy"] == name), key=lambda r: r["n_ticks"])
+        ns = [r["n_ticks"] for r in rows]
+        t_exp, t_r2 = fit_exponent(ns, [max(r["seconds"], 1e-9) for r in rows])
+        m_exp, m_r2 = fit_exponent(ns, [max(r["peak_bytes"], MEM_FLOOR_BYTES) for r in rows])
+        fits[name] = {"time_exp": t_exp, "time_r2": t_r2, "mem_exp": m_exp, "mem_r2": m_r2}
+    return fits
+
+def check_against_documented(fits: Dict[str, Dict[str, float]], strategy_classes: Dict[str, type],
+                             tol: float = 0.5) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare measured exponents to the ones implied by each strategy's docstring.
+    A strategy is flagged when |measured - expected| > tol for time or memory; the default
+    0.5 is the midpoint between adjacent classes, so a fit is judged by the nearest one.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, fit in fits.items():
+        cls = strategy_classes.get(name)
+        doc = documented_complexity(cls) if cls is not None else {"time": None, "space": None}
+        exp_t = _TIME_EXPONENT.get(doc["time"])
+        exp_m = _SPACE_EXPONENT.get(doc["space"])
+        problems = []
+        if exp_t is not None and abs(fit["time_exp"] - exp_t) > tol:
+            problems.append(f"time exponent {fit['time_exp']:.2f} vs documented O({doc['time']}) per tick (expected ~{exp_t:.0f})")
+        if exp_m is not None and abs(fit["mem_exp"] - exp_m) > tol:
+            problems.append(f"memory exponent {fit['mem_exp']:.2f} vs documented O({doc['space']}) space (expected ~{exp_m:.0f})")
+        out[name] = {
+            **fit,
+            "class": cls.__name__ if cls is not None else None,
+            "doc_time": doc["time"],
+            "doc_space": doc["space"],
+            "expected_time_exp": exp_t,
+            "expected_mem_exp": exp_m,
+            "flags": problems,
+        }
+    return out
+
+def _git_commit(cwd: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True,
+                              text=True, check=True).stdout.strip() or None
+    except Exception:
+        return None
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return json.load(f)
+
+def detect_regressions(history: List[Dict[str, Any]], fits: Dict[str, Dict[str, float]],
+                       tol: float = 0.5) -> List[str]:
+    """
+    Compare current exponents to the most recent recorded run.
+    Flags any strategy whose time or memory exponent grew by more than `tol`
+    (e.g. an O(1)-per-tick path that became O(n): total exponent 1 -> 2).
+    """
+    if not history:
+        return []
+    prev = history[-1]
+    found = []
+    for name, fit in fits.items():
+        old = prev["fits"].get(name)
+        if old is None:
+            continue
+        for key, label in (("time_exp", "time"), ("mem_exp", "memory")):
+            if fit[key] - old[key] > tol:
+                found.append(f"{name}: {label} exponent {old[key]:.2f} -> {fit[key]:.2f} (since {prev.get('commit') or 'previous run'})")
+    return found
+
+def record_history(path: str, fits: Dict[str, Dict[str, float]], max_entries: int = 200) -> List[Dict[str, Any]]:
+    """
+    Append this run's exponents (tagged with the current git commit) to a JSON history file.
+    """
+    history = load_history(path)
+    history.append({
+        "commit": _git_commit(os.path.dirname(os.path.abspath(path))),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "fits": {k: {"time_exp": v["time_exp"], "mem_exp": v["mem_exp"]} for k, v in fits.items()},
+    })
+    history = history[-max_entries:]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(history, f, indent=2)
+    return history
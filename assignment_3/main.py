@@ -1,11 +1,20 @@
 from __future__ import annotations
 import os
+import sys
 from typing import Dict, List
 from data_loader import read_market_csv, synth_to_csv
 from models import MarketDataPoint
-from strategies import NaiveMovingAverageStrategy, WindowedMovingAverageStrategy, OptimizedCumulativeAverageStrategy
-from profiler import run_benchmarks
-from reporting import plot_scaling, write_markdown_report
+from strategies import (
+    NaiveMovingAverageStrategy, WindowedMovingAverageStrategy, OptimizedCumulativeAverageStrategy,
+    KahanWindowedMovingAverageStrategy, KahanCumulativeAverageStrategy,
+    WelfordVolatilityStrategy, RollingRangeStrategy, SymbolRouter,
+)
+from profiler import (
+    run_benchmarks, run_stability_benchmarks, run_symbol_scaling_benchmarks,
+    ExactCumulativeMean, ExactWindowMean, ExactWindowStd,
+)
+from complexity import geometric_sizes, fit_scaling, check_against_documented, load_history, detect_regressions, record_history
+from reporting import plot_scaling, write_markdown_report, write_stability_report, write_symbol_scaling_report
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), "artifacts")
 
@@ -23,28 +32,82 @@ def main():
     ensure_data(data_path, n=30000)
     all_points = read_market_csv(data_path)
 
+    # geometric series so log-log fits have evenly spaced points; '*' = data repeated past the CSV length
+    sizes = geometric_sizes(1_000, 2, 6)
+    reps = -(-sizes[-1] // len(all_points))
     datasets = {
-        "1k": take_first(all_points, 1_000),
-        "10k": take_first(all_points, 10_000),
-        "100k*": take_first(all_points * 4, 100_000),
+        f"{n // 1000}k" + ("*" if n > len(all_points) else ""): take_first(all_points * reps, n)
+        for n in sizes
     }
 
     strategies = {
         "naive": lambda: NaiveMovingAverageStrategy(),
         "window_50": lambda: WindowedMovingAverageStrategy(window=50),
         "optimized_cum": lambda: OptimizedCumulativeAverageStrategy(),
+        "kahan_window_50": lambda: KahanWindowedMovingAverageStrategy(window=50),
+        "kahan_cum": lambda: KahanCumulativeAverageStrategy(),
+        "welford_50": lambda: WelfordVolatilityStrategy(window=50),
+        "range_50": lambda: RollingRangeStrategy(window=50),
     }
 
     results = run_benchmarks(strategies, datasets)
+    fits = fit_scaling(results)
+    checks = check_against_documented(fits, {name: type(f()) for name, f in strategies.items()})
+    history_path = os.path.join(OUT_DIR, "complexity_history.json")
+    regressions = detect_regressions(load_history(history_path), fits)
+    record_history(history_path, fits)
 
     os.makedirs(OUT_DIR, exist_ok=True)
-    runtime_path, mem_path = plot_scaling(results, OUT_DIR)
-    report_path = write_markdown_report(results, os.path.join(repo_dir, "complexity_report.md"))
+    runtime_path, mem_path = plot_scaling(results, OUT_DIR, fits)
+    report_path = write_markdown_report(results, os.path.join(repo_dir, "complexity_report.md"), checks, regressions)
 
     print("Artifacts:")
     print(" - Runtime plot:", runtime_path)
     print(" - Memory plot :", mem_path)
     print(" - Report      :", report_path)
+    for name, c in checks.items():
+        for flag in c["flags"]:
+            print(f"[complexity] {name}: {flag}")
+    for msg in regressions:
+        print(f"[regression] {msg}")
+    return 1 if regressions else 0
+
+def stability_main(sizes=(1_000_000, 10_000_000, 100_000_000)):
+    """
+    Speed and numerical error vs an exact reference for the running-sum strategies.
+    Usage: python main.py stability [n1 n2 ...]
+    """
+    repo_dir = os.path.dirname(__file__)
+    cases = {
+        "optimized_cum": (OptimizedCumulativeAverageStrategy, "ma_cum", ExactCumulativeMean),
+        "kahan_cum": (KahanCumulativeAverageStrategy, "ma_cum_kahan", ExactCumulativeMean),
+        "window_50": (lambda: WindowedMovingAverageStrategy(window=50), "ma_window", lambda: ExactWindowMean(50)),
+        "kahan_window_50": (lambda: KahanWindowedMovingAverageStrategy(window=50), "ma_window_kahan", lambda: ExactWindowMean(50)),
+        "welford_50": (lambda: WelfordVolatilityStrategy(window=50), "std_welford", lambda: ExactWindowStd(50)),
+    }
+    results = run_stability_benchmarks(cases, sizes=sizes)
+    report_path = write_stability_report(results, os.path.join(repo_dir, "stability_report.md"))
+    print(" - Stability report:", report_path)
+
+def symbols_main():
+    """
+    Scaling with symbol count as well as tick count for per-symbol routed strategies.
+    Usage: python main.py symbols
+    """
+    repo_dir = os.path.dirname(__file__)
+    strategies = {
+        "routed_window_50": lambda: SymbolRouter(lambda: WindowedMovingAverageStrategy(window=50)),
+        "routed_kahan_window_50": lambda: SymbolRouter(lambda: KahanWindowedMovingAverageStrategy(window=50)),
+        "routed_optimized_cum": lambda: SymbolRouter(OptimizedCumulativeAverageStrategy),
+    }
+    results = run_symbol_scaling_benchmarks(strategies, tick_counts=(10_000, 100_000), symbol_counts=(1, 10, 100, 1_000, 5_000))
+    report_path = write_symbol_scaling_report(results, os.path.join(repo_dir, "symbol_scaling_report.md"))
+    print(" - Symbol scaling report:", report_path)
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "stability":
+        stability_main(tuple(int(n) for n in sys.argv[2:]) or (1_000_000, 10_000_000, 100_000_000))
+    elif len(sys.argv) > 1 and sys.argv[1] == "symbols":
+        symbols_main()
+    else:
+        sys.exit(main())
@@ -1,10 +1,15 @@
 from __future__ import annotations
+import random
+import statistics
 import time
 import tracemalloc
-from typing import Callable, Dict, Any, List
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Tuple
 from models import MarketDataPoint, Strategy
+from rolling import ExactSum
 
-def consume_stream(strategy: Strategy, stream: List[MarketDataPoint]) -> int:
+def consume_stream(strategy: Strategy, stream: Iterable[MarketDataPoint]) -> int:
     """
     Feed all ticks to a strategy; return number of signals produced.
     This isolates the cost of generate_signals.
@@ -45,3 +50,157 @@ def run_benchmarks(strategy_factories: Dict[str, Callable[[], Strategy]], datase
             }
             results.append(row)
     return results
+
+def synth_stream(n: int, symbol: str = "XYZ", seed: int = 42) -> Iterator[MarketDataPoint]:
+    """
+    Lazily generate the same random walk as data_loader.synth_to_csv.
+    Nothing is materialized, so 100M-tick runs use O(1) memory for the input.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 9, 30, 0)
+    price = 100.0
+    for i in range(n):
+        price = max(0.01, price * (1 + 0.00005) + rng.gauss(0, 0.5))
+        yield MarketDataPoint(timestamp=start + timedelta(seconds=i), symbol=symbol, price=price)
+
+class ExactCumulativeMean:
+    """Exact mean of all prices seen so far (reference for cumulative averages)."""
+    def __init__(self):
+        self.n = 0
+        self.acc = ExactSum()
+
+    def push(self, x: float) -> None:
+        self.n += 1
+        self.acc.add(x)
+
+    def value(self) -> float:
+        return self.acc.value / self.n
+
+class ExactWindowMean:
+    """Exact mean of the last k prices (reference for windowed averages)."""
+    def __init__(self, window: int):
+        self.window = window
+        self.buf: deque = deque(maxlen=window)
+        self.acc = ExactSum()
+
+    def push(self, x: float) -> None:
+        if len(self.buf) == self.window:
+            self.acc.add(-self.buf[0])
+        self.buf.append(x)
+        self.acc.add(x)
+
+    def value(self) -> float:
+        return self.acc.value / len(self.buf)
+
+class ExactWindowStd:
+    """Exact population std of the last k prices; evaluated only at checkpoints."""
+    def __init__(self, window: int):
+        self.buf: deque = deque(maxlen=window)
+
+    def push(self, x: float) -> None:
+        self.buf.append(x)
+
+    def value(self) -> float:
+        # statistics.pstdev uses exact rational arithmetic for the sum of squares
+        return statistics.pstdev(self.buf)
+
+def synth_multi_stream(n: int, n_symbols: int, seed: int = 42) -> Iterator[MarketDataPoint]:
+    """
+    Lazily generate n ticks spread uniformly at random across n_symbols independent
+    random walks (symbols S0000, S0001, ...).
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 9, 30, 0)
+    symbols = [f"S{i:04d}" for i in range(n_symbols)]
+    prices = [100.0] * n_symbols
+    for i in range(n):
+        j = rng.randrange(n_symbols)
+        prices[j] = max(0.01, prices[j] * (1 + 0.00005) + rng.gauss(0, 0.5))
+        yield MarketDataPoint(timestamp=start + timedelta(seconds=i), symbol=symbols[j], price=prices[j])
+
+def run_symbol_scaling_benchmarks(strategy_factories: Dict[str, Callable[[], Strategy]],
+                                  tick_counts: Iterable[int] = (10_000, 100_000),
+                                  symbol_counts: Iterable[int] = (1, 10, 100, 1_000),
+                                  seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Profile each strategy over a grid of (tick count, symbol count) so per-tick cost
+    and per-symbol memory can be read off separately.
+    """
+    results: List[Dict[str, Any]] = []
+    for n in tick_counts:
+        for n_symbols in symbol_counts:
+            data = list(synth_multi_stream(n, n_symbols, seed=seed))
+            for name, factory in strategy_factories.items():
+                metrics = profile_strategy(factory, data)
+                results.append({
+                    "dataset": f"{_size_label(n)}x{n_symbols}",
+                    "n_ticks": n,
+                    "n_symbols": n_symbols,
+                    "strategy": name,
+                    **metrics,
+                })
+    return results
+
+def time_stream(strategy_factory: Callable[[], Strategy], stream: Iterable[MarketDataPoint]) -> float:
+    """
+    Wall time only (no tracemalloc, which slows large runs several-fold).
+    """
+    strat = strategy_factory()
+    t0 = time.perf_counter()
+    consume_stream(strat, stream)
+    return time.perf_counter() - t0
+
+def measure_numerical_error(strategy_factory: Callable[[], Strategy], signal: str,
+                            reference_factory: Callable[[], Any], stream: Iterable[MarketDataPoint],
+                            check_every: int = 1000) -> Dict[str, Any]:
+    """
+    Replay the stream through a strategy and an exact reference, comparing the named
+    signal every `check_every` ticks (and on the last tick).
+    Returns max and final absolute error.
+    """
+    strat = strategy_factory()
+    ref = reference_factory()
+    max_err = 0.0
+    err = 0.0
+    checks = 0
+    i = 0
+    for i, tick in enumerate(stream, 1):
+        sigs = strat.generate_signals(tick)
+        ref.push(tick.price)
+        if i % check_every == 0:
+            err = abs(dict(sigs)[signal] - ref.value())
+            max_err = max(max_err, err)
+            checks += 1
+    if i and i % check_every:
+        err = abs(dict(sigs)[signal] - ref.value())
+        max_err = max(max_err, err)
+        checks += 1
+    return {"max_abs_err": max_err, "final_abs_err": err, "checks": checks}
+
+def _size_label(n: int) -> str:
+    for unit, div in (("M", 1_000_000), ("k", 1_000)):
+        if n >= div and n % div == 0:
+            return f"{n // div}{unit}"
+    return str(n)
+
+def run_stability_benchmarks(cases: Dict[str, Tuple[Callable[[], Strategy], str, Callable[[], Any]]],
+                             sizes: Iterable[int] = (1_000_000, 10_000_000, 100_000_000),
+                             check_every: int = 1000, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    For each size and case (strategy factory, signal name, exact reference factory)
+    report wall time and numerical error vs the reference.
+    The input is streamed from synth_stream so memory does not scale with size.
+    """
+    results: List[Dict[str, Any]] = []
+    for n in sizes:
+        for name, (factory, signal, reference) in cases.items():
+            seconds = time_stream(factory, synth_stream(n, seed=seed))
+            errors = measure_numerical_error(factory, signal, reference, synth_stream(n, seed=seed), check_every)
+            results.append({
+                "dataset": _size_label(n),
+                "n_ticks": n,
+                "strategy": name,
+                "seconds": seconds,
+                **errors,
+            })
+    return results
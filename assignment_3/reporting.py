@@ -1,12 +1,15 @@
 from __future__ import annotations
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import matplotlib.pyplot as plt
 
 def _ensure_dir(path: str):
     os.makedirs(os.path.dirname(path), exist_ok=True)
 
-def plot_scaling(results: List[Dict[str, Any]], out_dir: str):
+def plot_scaling(results: List[Dict[str, Any]], out_dir: str, fits: Optional[Dict[str, Dict[str, float]]] = None):
+    """
+    Runtime and memory vs size; with `fits`, axes are log-scaled and legend labels carry the fitted exponent.
+    """
     labels = sorted(set(r["strategy"] for r in results))
     sizes = sorted(set(r["n_ticks"] for r in results))
     # Runtime vs size
@@ -18,9 +21,12 @@ def plot_scaling(results: List[Dict[str, Any]], out_dir: str):
                 if r["strategy"] == lbl and r["n_ticks"] == n:
                     xs.append(n)
                     ys.append(r["seconds"])
-        plt.plot(xs, ys, marker="o", label=lbl)
+        label = f'{lbl} (n^{fits[lbl]["time_exp"]:.2f})' if fits and lbl in fits else lbl
+        plt.plot(xs, ys, marker="o", label=label)
     plt.xlabel("Input size (ticks)")
     plt.ylabel("Runtime (seconds)")
+    if fits:
+        plt.xscale("log"); plt.yscale("log")
     plt.title("Runtime vs Input Size")
     plt.legend()
     runtime_path = os.path.join(out_dir, "runtime_vs_size.png")
@@ -37,9 +43,12 @@ def plot_scaling(results: List[Dict[str, Any]], out_dir: str):
                 if r["strategy"] == lbl and r["n_ticks"] == n:
                     xs.append(n)
                     ys.append(r["peak_bytes"] / (1024 * 1024.0))
-        plt.plot(xs, ys, marker="o", label=lbl)
+        label = f'{lbl} (n^{fits[lbl]["mem_exp"]:.2f})' if fits and lbl in fits else lbl
+        plt.plot(xs, ys, marker="o", label=label)
     plt.xlabel("Input size (ticks)")
     plt.ylabel("Peak memory (MB)")
+    if fits:
+        plt.xscale("log"); plt.yscale("symlog", linthresh=1e-3)
     plt.title("Memory Usage vs Input Size")
     plt.legend()
     mem_path = os.path.join(out_dir, "memory_vs_size.png")
@@ -49,7 +58,13 @@ def plot_scaling(results: List[Dict[str, Any]], out_dir: str):
 
     return runtime_path, mem_path
 
-def write_markdown_report(results: List[Dict[str, Any]], out_path: str):
+def write_markdown_report(results: List[Dict[str, Any]], out_path: str,
+                          checks: Optional[Dict[str, Dict[str, Any]]] = None,
+                          regressions: Optional[List[str]] = None):
+    """
+    Results table plus, when `checks` (complexity.check_against_documented) is given,
+    documented vs measured exponents and any flagged strategies / regressions.
+    """
     headers = ["dataset", "n_ticks", "strategy", "seconds", "peak_MB", "signals"]
     lines = []
     lines.append("# Complexity & Profiling Report\n")
@@ -68,10 +83,86 @@ def write_markdown_report(results: List[Dict[str, Any]], out_path: str):
         ]
         lines.append("| " + " | ".join(row) + " |")
 
-    lines.append("\n## Complexity Annotations\n")
-    lines.append("- **NaiveMovingAverageStrategy**: Time per tick O(n), Space O(n) (stores full history and recomputes sum).\n")
-    lines.append("- **WindowedMovingAverageStrategy**: Time per tick O(1), Space O(k) for fixed window.\n")
-    lines.append("- **OptimizedCumulativeAverageStrategy**: Time per tick O(1), Space O(1) by tracking (sum,count).\n")
+    if checks:
+        lines.append("\n## Complexity Annotations\n")
+        lines.append("Documented classes come from strategy docstrings; exponents are log-log fits of total runtime "
+                     "and peak memory vs n (O(1) per tick -> n^1 total time, O(n) per tick -> n^2).\n")
+        c_headers = ["strategy", "class", "doc time/tick", "doc space", "time exp (fit)", "r^2", "mem exp (fit)", "status"]
+        lines.append("| " + " | ".join(c_headers) + " |")
+        lines.append("|" + "|".join(["---"] * len(c_headers)) + "|")
+        for name in sorted(checks):
+            c = checks[name]
+            row = [
+                name,
+                str(c["class"]),
+                f'O({c["doc_time"]})' if c["doc_time"] else "-",
+                f'O({c["doc_space"]})' if c["doc_space"] else "-",
+                f'{c["time_exp"]:.2f}',
+                f'{c["time_r2"]:.3f}',
+                f'{c["mem_exp"]:.2f}',
+                "FLAG" if c["flags"] else "ok",
+            ]
+            lines.append("| " + " | ".join(row) + " |")
+        flagged = [(n, f) for n in sorted(checks) for f in checks[n]["flags"]]
+        if flagged:
+            lines.append("\n### Contradicts documented complexity\n")
+            for n, f in flagged:
+                lines.append(f"- **{n}**: {f}")
+
+    if regressions:
+        lines.append("\n## Scaling Regressions\n")
+        for msg in regressions:
+            lines.append(f"- {msg}")
+
+    with open(out_path, "w") as f:
+        f.write("\n".join(lines))
+    return out_path
+
+def write_stability_report(results: List[Dict[str, Any]], out_path: str):
+    headers = ["dataset", "n_ticks", "strategy", "seconds", "max_abs_err", "final_abs_err"]
+    lines = []
+    lines.append("# Numerical Stability Report\n")
+    lines.append("Running-sum strategies vs an exact (Shewchuk/fsum) reference on a synthetic random walk.\n")
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("|" + "|".join(["---"] * len(headers)) + "|")
+    for r in sorted(results, key=lambda x: (x["strategy"], x["n_ticks"])):
+        row = [
+            str(r["dataset"]),
+            str(r["n_ticks"]),
+            str(r["strategy"]),
+            f'{r["seconds"]:.3f}',
+            f'{r["max_abs_err"]:.3e}',
+            f'{r["final_abs_err"]:.3e}',
+        ]
+        lines.append("| " + " | ".join(row) + " |")
+
+    lines.append("\n## Notes\n")
+    lines.append("- **optimized_cum / window_50**: plain float running sums; error grows with tick count.\n")
+    lines.append("- **kahan_cum / kahan_window_50**: compensated sums (window re-anchored with fsum every k evictions); error stays at a few ulps.\n")
+    lines.append("- **welford_50**: rolling Welford variance, re-anchored every k evictions.\n")
+
+    with open(out_path, "w") as f:
+        f.write("\n".join(lines))
+    return out_path
+
+def write_symbol_scaling_report(results: List[Dict[str, Any]], out_path: str):
+    headers = ["n_ticks", "n_symbols", "strategy", "seconds", "us_per_tick", "peak_MB", "peak_KB_per_symbol"]
+    lines = []
+    lines.append("# Multi-Symbol Scaling Report\n")
+    lines.append("Per-symbol routed strategies across tick counts and symbol counts.\n")
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("|" + "|".join(["---"] * len(headers)) + "|")
+    for r in sorted(results, key=lambda x: (x["strategy"], x["n_ticks"], x["n_symbols"])):
+        row = [
+            str(r["n_ticks"]),
+            str(r["n_symbols"]),
+            str(r["strategy"]),
+            f'{r["seconds"]:.6f}',
+            f'{1e6 * r["seconds"] / r["n_ticks"]:.3f}',
+            f'{r["peak_bytes"] / (1024 * 1024.0):.3f}',
+            f'{r["peak_bytes"] / 1024.0 / r["n_symbols"]:.3f}',
+        ]
+        lines.append("| " + " | ".join(row) + " |")
 
     with open(out_path, "w") as f:
         f.write("\n".join(lines))
@@ -0,0 +1,203 @@
+from __future__ import annotations
+import math
+from collections import deque
+from typing import Deque, List, Tuple
+
+class KahanSum:
+    """
+    Compensated (Kahan-Babuska / Neumaier) running sum.
+    Keeps a second float that captures the low-order bits lost by each addition,
+    so the error stays O(eps) instead of growing O(n * eps) with the tick count.
+    Time per add: O(1). Space: O(1).
+    """
+    __slots__ = ("total", "comp")
+
+    def __init__(self, start: float = 0.0):
+        self.total: float = float(start)
+        self.comp: float = 0.0
+
+    def add(self, x: float) -> None:
+        t = self.total + x
+        if abs(self.total) >= abs(x):
+            self.comp += (self.total - t) + x
+        else:
+            self.comp += (x - t) + self.total
+        self.total = t
+
+    def reset(self, start: float = 0.0) -> None:
+        self.total = float(start)
+        self.comp = 0.0
+
+    @property
+    def value(self) -> float:
+        return self.total + self.comp
+
+class RollingKahanSum:
+    """
+    Fixed-window sum: compensated add of the new price and compensated subtract
+    of the evicted one. Every `reanchor` evictions the sum is rebuilt exactly from
+    the buffer with math.fsum, which bounds any residual drift.
+    Time per tick: O(1) amortized (O(k) re-anchor every `reanchor` ticks).
+    Space: O(k).
+    """
+    def __init__(self, window: int, reanchor: int = 0):
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.reanchor = reanchor or window
+        self.buf: Deque[float] = deque()
+        self.acc = KahanSum()
+        self._since_anchor = 0
+
+    def push(self, x: float) -> float:
+        self.buf.append(x)
+        self.acc.add(x)
+        if len(self.buf) > self.window:
+            self.acc.add(-self.buf.popleft())
+            self._since_anchor += 1
+            if self._since_anchor >= self.reanchor:
+                self.acc.reset(math.fsum(self.buf))
+                self._since_anchor = 0
+        return self.acc.value
+
+    def __len__(self) -> int:
+        return len(self.buf)
+
+    @property
+    def value(self) -> float:
+        return self.acc.value
+
+    @property
+    def mean(self) -> float:
+        return self.acc.value / len(self.buf) if self.buf else float("nan")
+
+class WelfordVariance:
+    """
+    Rolling mean/variance via Welford's update. When the window is full the
+    oldest value is swapped out in the same O(1) step:
+        mean' = mean + (x - y) / k
+        M2'   = M2 + (x - y) * (x - mean' + y - mean)
+    which avoids the catastrophic cancellation of sum(x^2) - sum(x)^2 / k.
+    Every `reanchor` evictions mean and M2 are recomputed from the buffer.
+    window=0 means unbounded (cumulative) variance with O(1) space.
+    Time per tick: O(1) amortized. Space: O(k) (O(1) if unbounded).
+    """
+    def __init__(self, window: int = 0, reanchor: int = 0):
+        if window < 0:
+            raise ValueError("window must be >= 0")
+        self.window = window
+        self.reanchor = reanchor or window
+        self.buf: Deque[float] = deque()
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._since_anchor = 0
+
+    def push(self, x: float) -> None:
+        if self.window and self.n == self.window:
+            y = self.buf.popleft()
+            self.buf.append(x)
+            old_mean = self.mean
+            self.mean += (x - y) / self.n
+            self.m2 += (x - y) * (x - self.mean + y - old_mean)
+            self._since_anchor += 1
+            if self._since_anchor >= self.reanchor:
+                self._anchor()
+            return
+        if self.window:
+            self.buf.append(x)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def _anchor(self) -> None:
+        mean = math.fsum(self.buf) / self.n
+        self.mean = mean
+        self.m2 = math.fsum((v - mean) ** 2 for v in self.buf)
+        self._since_anchor = 0
+
+    @property
+    def variance(self) -> float:
+        # population variance; clamp the tiny negatives rounding can produce
+        return max(self.m2, 0.0) / self.n if self.n else float("nan")
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.n else float("nan")
+
+class MonotonicMinMax:
+    """
+    Sliding-window min and max with two monotonic deques of (index, value).
+    Each price is pushed and popped at most once per deque.
+    Indices are re-anchored to zero every `reanchor` ticks so they stay small
+    on arbitrarily long streams.
+    Time per tick: O(1) amortized. Space: O(k).
+    """
+    def __init__(self, window: int, reanchor: int = 1 << 20):
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.reanchor = max(reanchor, window)
+        self.i = 0
+        self.lo: Deque[Tuple[int, float]] = deque()
+        self.hi: Deque[Tuple[int, float]] = deque()
+
+    def push(self, x: float) -> Tuple[float, float]:
+        i = self.i
+        lo, hi = self.lo, self.hi
+        while lo and lo[-1][1] >= x:
+            lo.pop()
+        lo.append((i, x))
+        while hi and hi[-1][1] <= x:
+            hi.pop()
+        hi.append((i, x))
+        cutoff = i - self.window
+        if lo[0][0] <= cutoff:
+            lo.popleft()
+        if hi[0][0] <= cutoff:
+            hi.popleft()
+        self.i = i + 1
+        if self.i >= self.reanchor:
+            self._anchor()
+        return lo[0][1], hi[0][1]
+
+    def _anchor(self) -> None:
+        shift = self.i
+        self.lo = deque((j - shift, v) for j, v in self.lo)
+        self.hi = deque((j - shift, v) for j, v in self.hi)
+        self.i = 0
+
+    @property
+    def min(self) -> float:
+        return self.lo[0][1] if self.lo else float("nan")
+
+    @property
+    def max(self) -> float:
+        return self.hi[0][1] if self.hi else float("nan")
+
+class ExactSum:
+    """
+    Reference accumulator with no rounding error (Shewchuk partials, the
+    algorithm behind math.fsum), usable incrementally. Only meant for
+    measuring the error of the fast accumulators above.
+    """
+    def __init__(self):
+        self.partials: List[float] = []
+
+    def add(self, x: float) -> None:
+        i = 0
+        for y in self.partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo:
+                self.partials[i] = lo
+                i += 1
+            x = hi
+        self.partials[i:] = [x]
+
+    @property
+    def value(self) -> float:
+        return math.fsum(self.partials)
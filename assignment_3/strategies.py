@@ -1,7 +1,9 @@
 from __future__ import annotations
+import sys
 from collections import deque
-from typing import List
+from typing import Callable, Dict, List
 from models import MarketDataPoint, Strategy
+from rolling import KahanSum, RollingKahanSum, WelfordVariance, MonotonicMinMax
 
 class NaiveMovingAverageStrategy(Strategy):
     """
@@ -57,3 +59,97 @@ class OptimizedCumulativeAverageStrategy(Strategy):
         self.sum_prices += tick.price
         avg = self.sum_prices / self.count
         return [("ma_cum", avg), ("price", tick.price)]
+
+class KahanWindowedMovingAverageStrategy(Strategy):
+    """
+    Drift-free variant of WindowedMovingAverageStrategy.
+    The window sum is compensated (Kahan) and periodically re-anchored with fsum,
+    so the error does not grow with the number of ticks.
+    Time per tick: O(1) amortized.
+    Space: O(k).
+    """
+    def __init__(self, window: int = 50, reanchor: int = 0):
+        self.window = window
+        self.rsum = RollingKahanSum(window, reanchor=reanchor)
+
+    def generate_signals(self, tick: MarketDataPoint) -> list:
+        self.rsum.push(tick.price)
+        return [("ma_window_kahan", self.rsum.mean), ("price", tick.price)]
+
+class KahanCumulativeAverageStrategy(Strategy):
+    """
+    Drift-free variant of OptimizedCumulativeAverageStrategy using a compensated sum.
+    Time per tick: O(1)
+    Space: O(1)
+    """
+    def __init__(self):
+        self.count: int = 0
+        self.sum_prices = KahanSum()
+
+    def generate_signals(self, tick: MarketDataPoint) -> list:
+        self.count += 1
+        self.sum_prices.add(tick.price)
+        return [("ma_cum_kahan", self.sum_prices.value / self.count), ("price", tick.price)]
+
+class WelfordVolatilityStrategy(Strategy):
+    """
+    Rolling mean and standard deviation of price over a window of k ticks (Welford).
+    window=0 tracks the whole history in O(1) space.
+    Time per tick: O(1) amortized.
+    Space: O(k).
+    """
+    def __init__(self, window: int = 50, reanchor: int = 0):
+        self.window = window
+        self.stats = WelfordVariance(window, reanchor=reanchor)
+
+    def generate_signals(self, tick: MarketDataPoint) -> list:
+        self.stats.push(tick.price)
+        return [("mean_welford", self.stats.mean), ("std_welford", self.stats.std), ("price", tick.price)]
+
+class RollingRangeStrategy(Strategy):
+    """
+    Rolling min/max of price over a window of k ticks using monotonic deques.
+    Time per tick: O(1) amortized.
+    Space: O(k).
+    """
+    def __init__(self, window: int = 50):
+        self.window = window
+        self.range = MonotonicMinMax(window)
+
+    def generate_signals(self, tick: MarketDataPoint) -> list:
+        lo, hi = self.range.push(tick.price)
+        return [("min_window", lo), ("max_window", hi), ("price", tick.price)]
+
+class SymbolRouter(Strategy):
+    """
+    Per-symbol dispatch layer: every symbol gets its own instance of the wrapped
+    strategy, so histories from different symbols never mix.
+    Symbols are interned and mapped to a dense integer id on first sight; state lives
+    in a list indexed by that id, so routing is one dict lookup plus one list index.
+    Time per tick: O(1) + cost of the wrapped strategy.
+    Space: O(S * state) for S symbols (bounded if the wrapped strategy is windowed).
+    """
+    def __init__(self, strategy_factory: Callable[[], Strategy]):
+        self.factory = strategy_factory
+        self.ids: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.states: List[Strategy] = []
+
+    def symbol_id(self, symbol: str) -> int:
+        sid = self.ids.get(symbol)
+        if sid is None:
+            symbol = sys.intern(symbol)
+            sid = len(self.states)
+            self.ids[symbol] = sid
+            self.symbols.append(symbol)
+            self.states.append(self.factory())
+        return sid
+
+    def state(self, symbol: str) -> Strategy:
+        return self.states[self.symbol_id(symbol)]
+
+    def generate_signals(self, tick: MarketDataPoint) -> list:
+        sid = self.ids.get(tick.symbol)
+        if sid is None:
+            sid = self.symbol_id(tick.symbol)
+        return [("symbol", self.symbols[sid])] + self.states[sid].generate_signals(tick)
@@ -2,6 +2,7 @@ import time
 import tracemalloc
 from data_loader import synth_to_csv, read_market_csv
 from strategies import NaiveMovingAverageStrategy, WindowedMovingAverageStrategy, OptimizedCumulativeAverageStrategy
+from strategies import KahanWindowedMovingAverageStrategy, KahanCumulativeAverageStrategy, WelfordVolatilityStrategy, RollingRangeStrategy, SymbolRouter
 from models import MarketDataPoint
 
 def run_stream(strat, data):
@@ -37,3 +38,43 @@ def test_performance_constraints():
     tracemalloc.stop()
     assert elapsed < 1.0, f"Elapsed {elapsed:.3f}s exceeds 1s"
     assert peak < 100 * 1024 * 1024, f"Peak {peak/1e6:.1f}MB exceeds 100MB"
+
+def test_rolling_variants_match_reference():
+    import math, random, statistics
+    random.seed(7)
+    prices = [100 + random.gauss(0, 5) for _ in range(2_000)]
+    k = 25
+    kw = KahanWindowedMovingAverageStrategy(window=k)
+    kc = KahanCumulativeAverageStrategy()
+    wv = WelfordVolatilityStrategy(window=k)
+    rr = RollingRangeStrategy(window=k)
+    for i, p in enumerate(prices):
+        tick = MarketDataPoint(timestamp=None, symbol="X", price=p)
+        win = prices[max(0, i - k + 1):i + 1]
+        assert abs(dict(kw.generate_signals(tick))["ma_window_kahan"] - math.fsum(win) / len(win)) < 1e-12
+        assert abs(dict(kc.generate_signals(tick))["ma_cum_kahan"] - math.fsum(prices[:i + 1]) / (i + 1)) < 1e-12
+        assert abs(dict(wv.generate_signals(tick))["std_welford"] - statistics.pstdev(win)) < 1e-9
+        sigs = dict(rr.generate_signals(tick))
+        assert sigs["min_window"] == min(win) and sigs["max_window"] == max(win)
+
+def test_symbol_router_keeps_histories_separate():
+    router = SymbolRouter(lambda: WindowedMovingAverageStrategy(window=2))
+    ticks = [("A", 1.0), ("B", 100.0), ("A", 3.0), ("B", 200.0), ("A", 5.0)]
+    out = [dict(router.generate_signals(MarketDataPoint(timestamp=None, symbol=s, price=p))) for s, p in ticks]
+    assert [o["ma_window"] for o in out] == [1.0, 100.0, 2.0, 150.0, 4.0]
+    assert out[-1]["symbol"] == "A"
+    assert router.symbols == ["A", "B"]
+
+def test_complexity_fit_flags_contradictions_and_regressions():
+    from complexity import fit_exponent, check_against_documented, detect_regressions
+    ns = [1_000, 2_000, 4_000, 8_000]
+    b, r2 = fit_exponent(ns, [3e-9 * n ** 2 for n in ns])
+    assert abs(b - 2.0) < 1e-9 and abs(r2 - 1.0) < 1e-9
+    fits = {
+        "optimized_cum": {"time_exp": 2.0, "time_r2": 1.0, "mem_exp": 0.0, "mem_r2": 1.0},
+        "naive": {"time_exp": 2.0, "time_r2": 1.0, "mem_exp": 1.0, "mem_r2": 1.0},
+    }
+    checks = check_against_documented(fits, {"optimized_cum": OptimizedCumulativeAverageStrategy, "naive": NaiveMovingAverageStrategy})
+    assert checks["optimized_cum"]["flags"] and not checks["naive"]["flags"]
+    history = [{"commit": "abc", "fits": {"optimized_cum": {"time_exp": 1.0, "mem_exp": 0.0}}}]
+    assert len(detect_regressions(history, fits)) == 1
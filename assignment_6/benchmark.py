@@ -0,0 +1,178 @@
+# Throughput benchmarks for the engine / strategy / analytics hot paths.
+# Usage: python -m assignment_6.benchmark [engine_ticks] [rolling_ticks]
+import json, os, random, sys, tempfile, time, tracemalloc
+from typing import Dict, Iterator, List
+from .models import MarketDataPoint, Stock, Position, PortfolioGroup, VolatilityDecorator, BetaDecorator, DrawdownDecorator
+from .data_loader import YahooFinanceAdapter
+from .engine import Engine
+from .reporting import summarize_orders
+from .patterns.command import ExecuteOrderCommand, CommandInvoker, OrderJournal
+from .patterns.observer import SignalPublisher, LoggerObserver, AlertObserver
+from .patterns.strategy import MeanReversionStrategy, BreakoutStrategy
+def synth_prices(n:int,seed:int=7,start:float=100.0)->List[float]:
+    rng=random.Random(seed); px=start; out=[]
+    for _ in range(n): px=max(0.01,px*(1+rng.gauss(0,0.01))); out.append(px)
+    return out
+def synth_ticks(n:int,symbol:str="X",seed:int=7)->Iterator[MarketDataPoint]:
+    # lazy feed so 10M-tick runs do not hold the input in memory
+    rng=random.Random(seed); px=100.0
+    for i in range(n): px=max(0.01,px*(1+rng.gauss(0,0.01))); yield MarketDataPoint(symbol,"",px)
+class _ListMeanReversion:
+    # pre-rolling-window implementation (unbounded list + slice sum), kept as the reference
+    def __init__(self,window,th): self.window, self.th, self.h = window, th, []
+    def generate_signals(self,tick):
+        self.h.append(tick.price)
+        if len(self.h)<self.window: return []
+        r=tick.price/(sum(self.h[-self.window:])/self.window)-1.0
+        if r<-self.th: return [{"action":"BUY","symbol":tick.symbol,"qty":100,"price":tick.price,"reason":"mr"}]
+        if r>self.th: return [{"action":"SELL","symbol":tick.symbol,"qty":100,"price":tick.price,"reason":"mr"}]
+        return []
+class _ListBreakout:
+    def __init__(self,window): self.window, self.h = window, []
+    def generate_signals(self,tick):
+        self.h.append(tick.price)
+        if len(self.h)<self.window: return []
+        hi=max(self.h[-self.window:]); lo=min(self.h[-self.window:])
+        if tick.price>=hi: return [{"action":"BUY","symbol":tick.symbol,"qty":100,"price":tick.price,"reason":"bo"}]
+        if tick.price<=lo: return [{"action":"SELL","symbol":tick.symbol,"qty":100,"price":tick.price,"reason":"bo"}]
+        return []
+def bench_rolling(n:int=10_000_000,window:int=20,check_every:int=1_000_000,verify:int=1_000_000)->Dict:
+    # 1) signals identical to the list/slice reference on the first `verify` ticks (random-walk prices, so no
+    #    return lands exactly on the threshold; see MeanReversionStrategy for the rounding caveat)
+    # 2) throughput over n ticks  3) traced memory sampled every `check_every` ticks (should stay flat)
+    out={}
+    for name,new,ref in (("mean_reversion",lambda: MeanReversionStrategy(lookback=window,threshold=0.01),lambda: _ListMeanReversion(window,0.01)),
+                         ("breakout",lambda: BreakoutStrategy(lookback=window),lambda: _ListBreakout(window))):
+        a,b=new(),ref(); mism=0
+        for t in synth_ticks(verify):
+            if a.generate_signals(t)!=b.generate_signals(t): mism+=1
+        del b
+        s=new(); gen=s.generate_signals; t0=time.perf_counter()
+        for t in synth_ticks(n): gen(t)
+        dt=time.perf_counter()-t0
+        s=new(); gen=s.generate_signals; mem=[]; tracemalloc.start()
+        for i,t in enumerate(synth_ticks(n),1):
+            gen(t)
+            if i%check_every==0: mem.append(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+        out[name]={"ticks":n,"mismatches":mism,"seconds":dt,"tps":n/dt,"traced_bytes":mem}
+    return out
+def _full_scan_metrics(prices,market_returns):
+    # what the stacked decorators used to do per get_metrics(): three return rebuilds + a peak scan
+    import statistics as st
+    rets=[prices[i]/prices[i-1]-1.0 for i in range(1,len(prices))]; vol=st.pstdev(rets)*(12**0.5)
+    rs=[prices[i]/prices[i-1]-1.0 for i in range(1,len(prices))]; n=min(len(rs),len(market_returns))
+    x=market_returns[-n:]; y=rs[-n:]; mx=sum(x)/n; my=sum(y)/n
+    cov=sum((x[i]-mx)*(y[i]-my) for i in range(n))/n; var=sum((x[i]-mx)**2 for i in range(n))/n
+    [prices[i]/prices[i-1]-1.0 for i in range(1,len(prices))]
+    peak=-1e18; dd=0.0
+    for p in prices:
+        peak=max(peak,p)
+        if peak>0: dd=min(dd,p/peak-1.0)
+    return {"volatility":vol,"beta":cov/var if var else float("nan"),"max_drawdown":dd}
+def bench_decorators(n:int=1_000_000,polls:int=1000)->Dict:
+    # stacked Volatility/Beta/Drawdown on n prices: full-scan cost vs incremental get_metrics() per new price.
+    # the market series grows in step with the prices (one return per period), as in a live feed
+    rng=random.Random(1); prices=synth_prices(n); mr=[rng.gauss(0,0.01) for _ in range(n-1)]
+    t0=time.perf_counter(); ref=_full_scan_metrics(prices,mr); t_full=time.perf_counter()-t0
+    inst=Stock("X","X")
+    for p in prices: inst.add_price(p)
+    d=DrawdownDecorator(BetaDecorator(VolatilityDecorator(inst),market_returns=mr))
+    t0=time.perf_counter(); m=d.get_metrics(); t_first=time.perf_counter()-t0
+    extra=synth_prices(polls,seed=11,start=prices[-1]); t0=time.perf_counter()
+    for p in extra: mr.append(rng.gauss(0,0.01)); d.add_price(p); d.get_metrics()
+    t_poll=(time.perf_counter()-t0)/polls
+    return {"prices":n,"full_scan_s":t_full,"first_get_metrics_s":t_first,"incremental_get_metrics_s":t_poll,
+            "speedup_per_poll":t_full/t_poll,"max_abs_diff":max(abs(m[k]-ref[k]) for k in ref)}
+def _tree(depth:int,fanout:int,leaf_positions:int,insts,rng):
+    g=PortfolioGroup(f"d{depth}")
+    if depth==0:
+        for _ in range(leaf_positions): g.add(Position(rng.choice(insts),rng.randint(1,100),100.0))
+    else:
+        for _ in range(fanout): g.add(_tree(depth-1,fanout,leaf_positions,insts,rng))
+    return g
+def bench_portfolio(depth:int=5,fanout:int=4,leaf_positions:int=5,n_instruments:int=50,ticks:int=200)->Dict:
+    # every tick: one price update per instrument, then value every node of the tree
+    rng=random.Random(3); insts=[Stock(f"S{i}",f"S{i}") for i in range(n_instruments)]
+    for s in insts: s.add_price(100.0)
+    root=_tree(depth,fanout,leaf_positions,insts,rng)
+    groups=[]; stack=[root]
+    while stack:
+        g=stack.pop(); groups.append(g); stack.extend(c for c in g.children if isinstance(c,PortfolioGroup))
+    def tick():
+        for s in insts: s.add_price(s.prices[-1]*(1+rng.gauss(0,0.01)))
+    t0=time.perf_counter()
+    for _ in range(ticks):
+        tick()
+        for g in groups: g.get_value()
+    t_rec=time.perf_counter()-t0
+    cp=root.compile(); t0=time.perf_counter()
+    for _ in range(ticks): tick(); comp=cp.values()
+    t_comp=time.perf_counter()-t0
+    ref=[g.get_value() for g in cp.groups]
+    return {"groups":len(groups),"positions":len(cp.positions),"ticks":ticks,"recursive_s":t_rec,"compiled_s":t_comp,
+            "speedup":t_rec/t_comp,"max_rel_diff":max(abs(a-b)/max(abs(b),1e-12) for a,b in zip(comp,ref))}
+class _ListOrderCommand:
+    # original ExecuteOrderCommand: copy-append, undo via membership test + remove (two list scans)
+    def __init__(self,book,order): self.book, self.order=book, order
+    def execute(self): self.book.append(self.order.copy()); return True
+    def undo(self):
+        if self.order in self.book: self.book.remove(self.order); return True
+        return False
+def bench_journal(n:int=1_000_000,undos:int=100,max_history:int=10_000)->Dict:
+    # undo/redo cost after n orders: original list book (scan per undo) vs OrderJournal (dict by sequence id)
+    out={}
+    for name,book,cmd in (("list",[],_ListOrderCommand),("journal",OrderJournal(),ExecuteOrderCommand)):
+        inv=CommandInvoker(max_history)
+        for i in range(n): inv.do(cmd(book,{"symbol":"X","action":"BUY","qty":i}))
+        t0=time.perf_counter()
+        for _ in range(undos): inv.undo()
+        for _ in range(undos): inv.redo()
+        out[name]={"orders":len(book),"undo_redo_us":1e6*(time.perf_counter()-t0)/(2*undos),"history":len(inv.done)}
+    return out
+def bench_summary(n:int=1_000_000,polls:int=100)->Dict:
+    # dashboard-style polling of (symbol, action) totals: full rescan vs the engine's incremental summary
+    e=_engine(MeanReversionStrategy,lookback=20,threshold=0.002)
+    for i in range(0,n,4096): e.on_ticks(list(synth_ticks(min(4096,n-i),seed=i)))
+    book=e.order_book; t0=time.perf_counter()
+    for _ in range(polls): full=summarize_orders(book)
+    t_full=(time.perf_counter()-t0)/polls; t0=time.perf_counter()
+    for _ in range(polls): inc=e.summary.snapshot()
+    t_inc=(time.perf_counter()-t0)/polls
+    return {"orders":len(book),"rescan_s":t_full,"incremental_s":t_inc,"match":full==inc}
+def write_yahoo_feed(path:str,n:int,symbols=("AAPL",),seed:int=7)->str:
+    # same layout YahooFinanceAdapter reads: {symbol: [{"date","price","volume"}, ...]}
+    data={s:[{"date":f"t{i}","price":p,"volume":0} for i,p in enumerate(synth_prices(n,seed+j))] for j,s in enumerate(symbols)}
+    with open(path,"w") as f: json.dump(data,f)
+    return path
+def _engine(strategy_cls,**kw):
+    pub=SignalPublisher(); log=[]; pub.attach(LoggerObserver(log)); pub.attach(AlertObserver(threshold_qty=500))
+    return Engine(strategy_cls(**kw),pub)
+def bench_engine(n:int=200_000,batch:int=4096,strategy_cls=MeanReversionStrategy,**kw)->Dict:
+    # tick-at-a-time vs on_ticks over a Yahoo feed; the resulting order books must be identical.
+    # Batching removes per-tick dispatch/command overhead and evaluates the strategy per block in numpy;
+    # what remains is per-order work (signal dicts, orders, summary), so the gain shrinks as more ticks fire.
+    # 200k ticks: mean reversion ~2.6x (68% of ticks fire), breakout ~2.5x -- not an order of magnitude
+    with tempfile.TemporaryDirectory() as d:
+        feed=YahooFinanceAdapter(write_yahoo_feed(os.path.join(d,"yahoo.json"),n)).get_data("AAPL")
+    kw=kw or {"lookback":20,"threshold":0.01}
+    e1=_engine(strategy_cls,**kw); t0=time.perf_counter()
+    for t in feed: e1.on_tick(t)
+    t_tick=time.perf_counter()-t0
+    e2=_engine(strategy_cls,**kw); t0=time.perf_counter()
+    for i in range(0,len(feed),batch): e2.on_ticks(feed[i:i+batch])
+    t_batch=time.perf_counter()-t0
+    assert e1.order_book==e2.order_book, "batch mode changed the order book"
+    return {"ticks":len(feed),"orders":len(e1.order_book),"on_tick_s":t_tick,"on_ticks_s":t_batch,
+            "on_tick_tps":len(feed)/t_tick,"on_ticks_tps":len(feed)/t_batch,"speedup":t_tick/t_batch}
+def main(argv=None):
+    argv=sys.argv[1:] if argv is None else argv
+    n=int(argv[0]) if argv else 200_000
+    print("engine:",bench_engine(n))
+    print("rolling:",bench_rolling(int(argv[1]) if len(argv)>1 else 10_000_000))
+    print("decorators:",bench_decorators())
+    print("portfolio:",bench_portfolio())
+    print("journal:",bench_journal())
+    print("summary:",bench_summary())
+if __name__=="__main__":
+    main()
@@ -1,24 +1,64 @@
 
-import json, xml.etree.ElementTree as ET, csv
-from typing import List
+import json, xml.etree.ElementTree as ET, csv, io, mmap, os
+from xml.parsers import expat
+from typing import List, Dict, Iterator, Tuple, Any
 from .models import MarketDataPoint
+# path -> (mtime_ns, size, payload); a file is parsed/indexed once and reused until it changes on disk
+_CACHE: Dict[Tuple[str,str],Tuple[int,int,Any]]={}
+def _cached(kind:str,path,build):
+    p=os.path.abspath(str(path)); st=os.stat(p); key=(kind,p); hit=_CACHE.get(key)
+    if hit is not None and hit[0]==st.st_mtime_ns and hit[1]==st.st_size: return hit[2]
+    val=build(p); _CACHE[key]=(st.st_mtime_ns,st.st_size,val); return val
 class YahooFinanceAdapter:
     def __init__(self,path): self.path=path
-    def get_data(self,symbol:str)->List[MarketDataPoint]:
-        with open(self.path,"r") as f: data=json.load(f)
-        out=[]
-        for row in data.get(symbol,[]):
-            out.append(MarketDataPoint(symbol,row["date"],float(row["price"]),float(row.get("volume",0)),row))
-        return out
+    def _load(self)->Dict[str,Any]:
+        def build(p):
+            with open(p,"r") as f: return json.load(f)
+        return _cached("json",self.path,build)
+    def iter_data(self,symbol:str)->Iterator[MarketDataPoint]:
+        data=self._load()
+        rows=data.get(symbol,[]) if isinstance(data,dict) else []
+        for row in rows if isinstance(rows,list) else []:
+            yield MarketDataPoint(symbol,row["date"],float(row["price"]),float(row.get("volume",0)),row)
+    def get_data(self,symbol:str)->List[MarketDataPoint]: return list(self.iter_data(symbol))
+_SEC_CLOSE=b"</security"
+def _index_xml(path:str)->Dict[str,List[Tuple[int,int]]]:
+    # symbol -> [(start, end)] byte spans of each non-empty top-level <security> element. expat does the
+    # scan, so comments, CDATA and entity-encoded attributes (symbol="AT&amp;T") follow XML rules; it
+    # streams the file and builds no tree, so indexing a multi-GB file stays O(1) in memory
+    idx: Dict[str,List[Tuple[int,int]]]={}
+    if os.path.getsize(path)==0: return idx
+    p=expat.ParserCreate(); found=[]; depth=[0,None,0]  # [security nesting, symbol, start byte]
+    def start(name,attrs):
+        if name!="security": return
+        if depth[0]==0: depth[1]=attrs.get("symbol"); depth[2]=p.CurrentByteIndex
+        depth[0]+=1
+    def end(name):
+        if name!="security": return
+        depth[0]-=1
+        if depth[0]==0 and depth[1] is not None: found.append((depth[1],depth[2],p.CurrentByteIndex))
+    p.StartElementHandler=start; p.EndElementHandler=end
+    with open(path,"rb") as f: p.ParseFile(f)
+    with open(path,"rb") as f, mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as mm:
+        for sym,a,b in found:
+            # an empty <security/> reports its end just past itself, where no </security> starts
+            if mm[b:b+len(_SEC_CLOSE)]==_SEC_CLOSE: idx.setdefault(sym,[]).append((a,mm.find(b">",b)+1))
+    return idx
 class BloombergXMLAdapter:
     def __init__(self,path): self.path=path
-    def get_data(self,symbol:str)->List[MarketDataPoint]:
-        tree=ET.parse(self.path); root=tree.getroot(); out=[]
-        for sec in root.findall(".//security"):
-            if sec.get("symbol")==symbol:
-                for r in sec.findall("row"):
-                    ts=r.findtext("date"); pr=float(r.findtext("price")); vol=float(r.findtext("volume") or 0)
-                    out.append(MarketDataPoint(symbol,ts,pr,vol,{}))
-        return out
+    def iter_data(self,symbol:str)->Iterator[MarketDataPoint]:
+        # seek straight to the symbol's <security> spans and iterparse only those bytes, clearing each
+        # row once emitted, so cost is proportional to the symbol's data rather than the whole file
+        spans=_cached("xml",self.path,_index_xml).get(symbol,[])
+        if not spans: return
+        with open(self.path,"rb") as f:
+            for start,end in spans:
+                f.seek(start); buf=io.BytesIO(f.read(end-start))
+                for _ev,el in ET.iterparse(buf,events=("end",)):
+                    if el.tag!="row": continue
+                    ts=el.findtext("date"); pr=float(el.findtext("price")); vol=float(el.findtext("volume") or 0)
+                    el.clear()
+                    yield MarketDataPoint(symbol,ts,pr,vol,{})
+    def get_data(self,symbol:str)->List[MarketDataPoint]: return list(self.iter_data(symbol))
 def load_instruments_csv(path):
     with open(path,newline="") as f: return list(csv.DictReader(f))
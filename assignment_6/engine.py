@@ -1,14 +1,40 @@
 
-from typing import List, Dict
+from typing import Dict, Iterable, Optional
 from .patterns.strategy import Strategy
 from .patterns.observer import SignalPublisher
-from .patterns.command import ExecuteOrderCommand, CommandInvoker
+from .patterns.command import ExecuteOrderCommand, ExecuteOrdersCommand, CommandInvoker, OrderJournal, OrderBookView
+from .reporting import OrderSummary
+def _order(sig:Dict,price:Optional[float]=None)->Dict:
+    # orders carry the triggering tick's price (from the signal, else the tick) so notional is the same
+    # whether they came from on_tick or on_ticks
+    o={"symbol":sig["symbol"],"action":sig["action"],"qty":sig["qty"]}
+    px=sig.get("price",price)
+    if px is not None: o["price"]=px
+    return o
 class Engine:
-    def __init__(self,strategy:Strategy,publisher:SignalPublisher):
-        self.strategy=strategy; self.publisher=publisher; self.invoker=CommandInvoker(); self.order_book: List[Dict]=[]
+    # undo_last/redo_last act on the last command: one order after on_tick, but the whole batch's orders
+    # after on_ticks (they are appended by a single ExecuteOrdersCommand)
+    def __init__(self,strategy:Strategy,publisher:SignalPublisher,max_history:Optional[int]=None,journal_path:Optional[str]=None):
+        self.strategy=strategy; self.publisher=publisher; self.invoker=CommandInvoker(max_history); self.journal=OrderJournal(journal_path)
+        self.summary=self.journal.attach(OrderSummary()); self._book=self.journal.view()
+    @property
+    def order_book(self)->OrderBookView:
+        # read-only live view (no copy per access); orders change only through commands, list(...) for a snapshot
+        return self._book
     def on_tick(self,tick):
+        self.summary.mark(tick.symbol,tick.price)
         for sig in self.strategy.generate_signals(tick):
             self.publisher.notify(sig)
-            cmd=ExecuteOrderCommand(self.order_book,{"symbol":sig["symbol"],"action":sig["action"],"qty":sig["qty"]}); self.invoker.do(cmd)
+            cmd=ExecuteOrderCommand(self.journal,_order(sig,tick.price)); self.invoker.do(cmd)
+    def on_ticks(self,ticks:Iterable)->int:
+        # batch mode: same order_book as calling on_tick per tick, but observers are notified once per
+        # batch (see SignalPublisher.notify_batch) and orders are appended in one command
+        ticks=ticks if isinstance(ticks,list) else list(ticks)
+        sigs=self.strategy.generate_signals_batch(ticks)
+        for t in ticks: self.summary.mark(t.symbol,t.price)
+        if not sigs: return 0
+        self.publisher.notify_batch(sigs)
+        self.invoker.do(ExecuteOrdersCommand(self.journal,[_order(s) for s in sigs]))
+        return len(sigs)
     def undo_last(self): self.invoker.undo()
     def redo_last(self): self.invoker.redo()
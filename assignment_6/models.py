@@ -1,14 +1,32 @@
 
 from __future__ import annotations
+import weakref
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 @dataclass
 class MarketDataPoint:
     symbol: str; ts: str; price: float; volume: float=0.0; extra: Dict[str,Any]=field(default_factory=dict)
+def _watch(obj, fn):
+    # register a change callback (used by CompiledPortfolio for dirty flags). Bound methods are held
+    # through WeakMethod so a discarded CompiledPortfolio is not kept alive by the objects it watched;
+    # dead entries are pruned here and on the next change
+    ls=obj.__dict__.get("_listeners")
+    if ls is None: ls=obj._listeners=[]
+    else: ls[:]=[r for r in ls if r() is not None]
+    ls.append(weakref.WeakMethod(fn) if hasattr(fn,"__self__") else (lambda: fn))
+def _changed(obj):
+    ls=obj.__dict__.get("_listeners")
+    if ls:
+        dead=False
+        for r in ls:
+            f=r()
+            if f is None: dead=True
+            else: f()
+        if dead: ls[:]=[r for r in ls if r() is not None]
 class Instrument:
     def __init__(self, symbol: str, name: str, meta: Optional[Dict[str,Any]]=None):
         self.symbol, self.name, self.meta = symbol, name, meta or {}; self.prices: List[float]=[]
-    def add_price(self, p: float): self.prices.append(float(p))
+    def add_price(self, p: float): self.prices.append(float(p)); _changed(self)
     def get_metrics(self) -> Dict[str,Any]:
         last = self.prices[-1] if self.prices else float("nan"); return {"symbol":self.symbol,"last":last}
     def __repr__(self): return f"{self.__class__.__name__}({self.symbol})"
@@ -21,6 +39,10 @@ class PortfolioComponent:
 class Position(PortfolioComponent):
     def __init__(self, instrument: Instrument, quantity: float, price: float):
         self.instrument, self.quantity, self.price = instrument, quantity, price
+    @property
+    def quantity(self): return self._quantity
+    @quantity.setter
+    def quantity(self, q): self._quantity=q; _changed(self)
     def get_value(self) -> float:
         px = self.instrument.prices[-1] if self.instrument.prices else self.price
         return self.quantity*px
@@ -29,12 +51,135 @@ class PortfolioGroup(PortfolioComponent):
     def __init__(self, name: str):
         self.name=name; self.children: List[PortfolioComponent]=[]
     def add(self, comp: PortfolioComponent):
-        self.children.append(comp); return self
+        self.children.append(comp); _changed(self); return self
     def get_value(self) -> float: return sum(c.get_value() for c in self.children)
     def get_positions(self) -> List['Position']:
         out: List[Position]=[]
         for c in self.children: out.extend(c.get_positions())
         return out
+    def compile(self) -> 'CompiledPortfolio': return CompiledPortfolio(self)
+class CompiledPortfolio:
+    # Flattened view of a PortfolioGroup tree for repeated revaluation. Positions are laid out in DFS
+    # order, so every group owns a contiguous [start, end) slice of the position arrays. One flat pass
+    # computes every position value plus a prefix sum; each node's value is then a difference of two
+    # prefix entries. Results are cached until a price (Instrument.add_price), a quantity or the tree
+    # structure changes, which flip a dirty flag (structure changes trigger a recompile).
+    def __init__(self, root: PortfolioGroup):
+        self.root=root; self._watched=set(); self._compile()
+    def _watch(self, obj, fn):
+        if id(obj) not in self._watched: self._watched.add(id(obj)); _watch(obj,fn)
+    def _compile(self):
+        self.positions: List[Position]=[]; self.groups: List[PortfolioGroup]=[]; self.spans: List[tuple]=[]
+        self._slot: Dict[int,tuple]={}; stack=[(self.root,False)]; starts={}
+        while stack:
+            node,done=stack.pop()
+            if isinstance(node, PortfolioGroup):
+                if done:
+                    span=(starts.pop(id(node)),len(self.positions)); self._slot[id(node)]=span
+                    self.groups.append(node); self.spans.append(span); continue
+                starts[id(node)]=len(self.positions); stack.append((node,True))
+                stack.extend((c,False) for c in reversed(node.children))
+                self._watch(node,self._restructure)
+            else:
+                i=len(self.positions); self.positions.append(node); self._slot[id(node)]=(i,i+1)
+                self._watch(node,self._invalidate)
+                inst=node.instrument
+                while hasattr(inst,"inner"): inst=inst.inner
+                self._watch(inst,self._invalidate)
+        self.vals=[0.0]*len(self.positions); self.prefix=[0.0]*(len(self.positions)+1)
+        self.stale=False; self.dirty=True
+    def _invalidate(self): self.dirty=True
+    def _restructure(self): self.stale=True
+    def revalue(self):
+        if self.stale: self._compile()
+        vals, prefix, acc = self.vals, self.prefix, 0.0
+        for i,p in enumerate(self.positions):
+            px=p.instrument.prices; v=p.quantity*(px[-1] if px else p.price)
+            vals[i]=v; acc+=v; prefix[i+1]=acc
+        self.dirty=False
+    def value(self, node: Optional[PortfolioComponent]=None) -> float:
+        if self.dirty or self.stale: self.revalue()
+        a,b=self._slot[id(node if node is not None else self.root)]
+        return self.prefix[b]-self.prefix[a] if b-a!=1 else self.vals[a]
+    def values(self) -> List[float]:
+        # value of every group, aligned with self.groups (post-order: children before parents)
+        if self.dirty or self.stale: self.revalue()
+        pre=self.prefix; return [pre[b]-pre[a] for a,b in self.spans]
+    def get_positions(self, node: Optional[PortfolioComponent]=None) -> List[Position]:
+        if self.stale: self._compile()
+        a,b=self._slot[id(node if node is not None else self.root)]; return self.positions[a:b]
+class _PriceStream:
+    # one per base instrument, shared by every decorator in a chain: each new price (and its simple
+    # return, None for the first) is computed once and fanned out to the attached accumulators.
+    # sync() is incremental; if the price list was replaced or shrank, accumulators are rebuilt.
+    # Accumulators are owned by their decorator (self._acc) and held here weakly, so decorators that are
+    # discarded drop out of the fan-out instead of accumulating on the base instrument forever
+    def __init__(self, inst: Instrument):
+        self.inst=inst; self.src=inst.prices; self.n=0; self.accs: List[weakref.ref]=[]
+    def attach(self, acc):
+        # late joiners replay what the stream already consumed
+        prev=None
+        for p in self.src[:self.n]: acc.push(p, None if prev is None else p/prev-1.0); prev=p
+        self.accs[:]=[r for r in self.accs if r() is not None]
+        self.accs.append(weakref.ref(acc)); return acc
+    def sync(self):
+        px=self.inst.prices
+        accs=[a for a in (r() for r in self.accs) if a is not None]
+        if len(accs)!=len(self.accs): self.accs[:]=[weakref.ref(a) for a in accs]
+        if px is not self.src or len(px)<self.n:
+            self.src=px; self.n=0
+            for a in accs: a.reset()
+        n=len(px)
+        if n==self.n: return
+        prev=px[self.n-1] if self.n else None
+        for i in range(self.n, n):
+            p=px[i]; r=None if prev is None else p/prev-1.0; prev=p
+            for a in accs: a.push(p, r)
+        self.n=n
+def _price_stream(inst: Instrument) -> _PriceStream:
+    while isinstance(inst, InstrumentDecorator): inst=inst.inner
+    st=inst.__dict__.get("_stream")
+    if st is None: st=inst._stream=_PriceStream(inst)
+    return st
+class _VolAcc:
+    # Welford population variance of returns
+    def __init__(self): self.reset()
+    def reset(self): self.n=0; self.mean=0.0; self.m2=0.0
+    def push(self, p, r):
+        if r is None: return
+        self.n+=1; d=r-self.mean; self.mean+=d/self.n; self.m2+=d*(r-self.mean)
+def _tail_beta(prices, mr):
+    # beta over the last n=min(#returns, len(mr)) periods of both series (tail-aligned, full scan)
+    rs=[prices[i]/prices[i-1]-1.0 for i in range(1,len(prices))]
+    n=min(len(rs),len(mr)); x=mr[-n:]; y=rs[-n:]
+    mx=sum(x)/n; my=sum(y)/n
+    cov=sum((x[i]-mx)*(y[i]-my) for i in range(n))/n; var=sum((x[i]-mx)**2 for i in range(n))/n
+    return cov/var if var!=0 else float("nan")
+class _BetaAcc:
+    # streaming co-moment of (market_returns[k], k-th stock return); pairs are index-aligned from the
+    # start, and stock returns that arrive before their market return are picked up from prices later.
+    # Head and tail alignment agree only while both series have the same length (see BetaDecorator)
+    def __init__(self, market_returns): self.mr=market_returns; self.reset()
+    def reset(self): self.k=0; self.n=0; self.mx=0.0; self.my=0.0; self.cxy=0.0; self.m2x=0.0
+    def _pair(self, x, y):
+        self.n+=1; dx=x-self.mx; self.mx+=dx/self.n; self.my+=(y-self.my)/self.n
+        self.cxy+=dx*(y-self.my); self.m2x+=dx*(x-self.mx)
+    def push(self, p, r):
+        if r is None: return
+        if self.n==self.k<len(self.mr): self._pair(self.mr[self.k], r)
+        self.k+=1
+    def catch_up(self, prices):
+        top=min(self.k, len(self.mr))
+        for i in range(self.n, top): self._pair(self.mr[i], prices[i+1]/prices[i]-1.0)
+class _DrawdownAcc:
+    # same arithmetic as the full scan, carried forward: running peak and worst p/peak-1
+    def __init__(self): self.reset()
+    def reset(self): self.peak=-1e18; self.dd=0.0
+    def push(self, p, r):
+        if p>self.peak: self.peak=p
+        if self.peak>0:
+            d=p/self.peak-1.0
+            if d<self.dd: self.dd=d
 class InstrumentDecorator(Instrument):
     def __init__(self, inner: Instrument):
         # Don't call super().__init__ here; it would trigger the prices setter too early.
@@ -53,35 +198,39 @@ class InstrumentDecorator(Instrument):
 
     def add_price(self, p: float):
         self.inner.add_price(p)
+        _price_stream(self).sync()
 
     def get_metrics(self) -> Dict[str, Any]:
         return self.inner.get_metrics().copy()
 
+# Metric decorators keep incremental state on the chain's shared _PriceStream, updated as prices are
+# added (prices appended straight to the inner instrument are caught up lazily), so get_metrics() is
+# O(1) amortized and stacked decorators compute each return once.
 class VolatilityDecorator(InstrumentDecorator):
+    def __init__(self, inner: Instrument):
+        super().__init__(inner); self._acc=_price_stream(self).attach(_VolAcc())
     def get_metrics(self):
-        m=super().get_metrics()
-        if len(self.prices)>1:
-            rets=[self.prices[i]/self.prices[i-1]-1.0 for i in range(1,len(self.prices))]
-            import statistics as st; m["volatility"]=st.pstdev(rets)*(12**0.5)
-        else: m["volatility"]=float("nan")
+        m=super().get_metrics(); _price_stream(self).sync(); a=self._acc
+        m["volatility"]=(max(a.m2,0.0)/a.n)**0.5*(12**0.5) if a.n else float("nan")
         return m
 class BetaDecorator(InstrumentDecorator):
     def __init__(self, inner: Instrument, market_returns=None):
         super().__init__(inner); self.market_returns=market_returns
+        self._acc=_price_stream(self).attach(_BetaAcc(market_returns if market_returns is not None else []))
     def get_metrics(self):
-        m=super().get_metrics()
-        if self.market_returns and len(self.prices)>1:
-            rs=[self.prices[i]/self.prices[i-1]-1.0 for i in range(1,len(self.prices))]
-            n=min(len(rs),len(self.market_returns)); x=self.market_returns[-n:]; y=rs[-n:]
-            mx=sum(x)/n; my=sum(y)/n
-            cov=sum((x[i]-mx)*(y[i]-my) for i in range(n))/n; var=sum((x[i]-mx)**2 for i in range(n))/n
-            m["beta"]=cov/var if var!=0 else float("nan")
+        # beta pairs the last n returns of each series; the incremental co-moment is used when the series
+        # line up (one market return per stock return), otherwise it is recomputed tail-aligned
+        m=super().get_metrics(); _price_stream(self).sync(); a=self._acc; mr=self.market_returns
+        if mr and a.k:
+            if a.k==len(mr):
+                a.catch_up(self.prices)
+                m["beta"]=a.cxy/a.m2x if a.n and a.m2x!=0 else float("nan")
+            else: m["beta"]=_tail_beta(self.prices,mr)
         else: m["beta"]=float("nan")
         return m
 class DrawdownDecorator(InstrumentDecorator):
+    def __init__(self, inner: Instrument):
+        super().__init__(inner); self._acc=_price_stream(self).attach(_DrawdownAcc())
     def get_metrics(self):
-        m=super().get_metrics(); peak=-1e18; dd=0.0
-        for p in self.prices:
-            peak=max(peak,p); 
-            if peak>0: dd=min(dd,p/peak-1.0)
-        m["max_drawdown"]=dd; return m
+        m=super().get_metrics(); _price_stream(self).sync()
+        m["max_drawdown"]=self._acc.dd; return m
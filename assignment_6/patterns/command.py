@@ -1,16 +1,130 @@
 
-from typing import List, Dict
+import json, os
+from collections import deque
+from collections.abc import Sequence
+from itertools import islice
+from typing import List, Dict, Optional, Iterator, Any
+class OrderJournal:
+    # Live orders keyed by sequence id (dict insertion order == book order), so removing any order is
+    # O(1) instead of a list scan. With `path`, every add/remove is also appended to a JSON-lines file;
+    # every `snapshot_every` records the live book is written to `<path>.snap` and the log restarts,
+    # so the file stays bounded. Opening an existing path replays snapshot + log.
+    # listeners get on_add(seq, order) / on_remove(seq, order) for every change (e.g. OrderSummary).
+    def __init__(self,path:Optional[str]=None,snapshot_every:int=100_000):
+        self.orders: Dict[int,Dict]={}; self.next_seq=0; self.path=path; self.snapshot_every=snapshot_every
+        self._f=None; self._since_snap=0; self.listeners: List[Any]=[]
+        if path:
+            self._load(); self._f=open(path,"a",encoding="utf-8")
+    def attach(self,listener):
+        # replays the current book so the listener starts in sync
+        for s,o in self.orders.items(): listener.on_add(s,o)
+        self.listeners.append(listener); return listener
+    def add(self,order:Dict,seq:Optional[int]=None)->int:
+        if seq is None: seq=self.next_seq; self.next_seq+=1
+        self.orders[seq]=order
+        for l in self.listeners: l.on_add(seq,order)
+        if self._f: self._log({"op":"add","seq":seq,"order":order})
+        return seq
+    def add_many(self,orders:List[Dict],seqs:Optional[List[int]]=None)->List[int]:
+        if seqs is None: seqs=list(range(self.next_seq,self.next_seq+len(orders))); self.next_seq+=len(orders)
+        self.orders.update(zip(seqs,orders))
+        for l in self.listeners:
+            for s,o in zip(seqs,orders): l.on_add(s,o)
+        if self._f:
+            for s,o in zip(seqs,orders): self._log({"op":"add","seq":s,"order":o})
+        return seqs
+    def remove(self,seq:int)->bool:
+        o=self.orders.pop(seq,None)
+        if o is None: return False
+        for l in self.listeners: l.on_remove(seq,o)
+        if self._f: self._log({"op":"remove","seq":seq})
+        return True
+    def remove_many(self,seqs:List[int])->bool:
+        return all([self.remove(s) for s in seqs])
+    def __iter__(self)->Iterator[Dict]: return iter(self.orders.values())
+    def __len__(self): return len(self.orders)
+    def as_list(self)->List[Dict]: return list(self.orders.values())
+    def view(self)->"OrderBookView": return OrderBookView(self)
+    def _log(self,rec:Dict):
+        self._f.write(json.dumps(rec)+"\n"); self._since_snap+=1
+        if self._since_snap>=self.snapshot_every: self.snapshot()
+    def snapshot(self):
+        if not self.path: return
+        tmp=self.path+".snap.tmp"
+        with open(tmp,"w",encoding="utf-8") as f: json.dump({"next_seq":self.next_seq,"orders":list(self.orders.items())},f)
+        os.replace(tmp,self.path+".snap")
+        # replaying a stale log on top of the snapshot is harmless (adds overwrite, removes of missing ids no-op)
+        if self._f: self._f.close()
+        self._f=open(self.path,"w",encoding="utf-8"); self._since_snap=0
+    def _load(self):
+        snap=self.path+".snap"
+        if os.path.exists(snap):
+            with open(snap,encoding="utf-8") as f: d=json.load(f)
+            self.orders={int(s):o for s,o in d["orders"]}; self.next_seq=d["next_seq"]
+        if os.path.exists(self.path):
+            with open(self.path,encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip(): continue
+                    try: r=json.loads(line)
+                    except ValueError: break  # torn final write
+                    if r["op"]=="add": self.orders[r["seq"]]=r["order"]; self.next_seq=max(self.next_seq,r["seq"]+1)
+                    else: self.orders.pop(r["seq"],None)
+    def flush(self):
+        if self._f: self._f.flush()
+    def close(self):
+        if self._f: self._f.close(); self._f=None
+class OrderBookView(Sequence):
+    # Read-only, zero-copy view of a journal's live orders in book order (what Engine.order_book returns).
+    # len() is O(1) and iteration walks the journal without building a list; there is no append/clear/del,
+    # orders change only through commands. Compares equal to a list (or view) holding the same orders.
+    __slots__=("_orders",)
+    def __init__(self,journal:"OrderJournal"): self._orders=journal.orders
+    def __len__(self): return len(self._orders)
+    def __iter__(self)->Iterator[Dict]: return iter(self._orders.values())
+    def __reversed__(self)->Iterator[Dict]: return reversed(self._orders.values())
+    def __getitem__(self,i):
+        vals=self._orders.values()
+        if isinstance(i,slice): return list(vals)[i]
+        n=len(self._orders)
+        if i<0: i+=n
+        if not 0<=i<n: raise IndexError("order book index out of range")
+        # walk from the nearer end
+        return next(islice(vals,i,None)) if i<n//2 else next(islice(reversed(vals),n-1-i,None))
+    def __eq__(self,other):
+        if isinstance(other,(OrderBookView,list,tuple)): return len(self)==len(other) and all(a==b for a,b in zip(self,other))
+        return NotImplemented
+    __hash__=None
+    def __repr__(self): return f"OrderBookView({list(self._orders.values())!r})"
 class Command:
     def execute(self): ...
     def undo(self): ...
 class ExecuteOrderCommand(Command):
-    def __init__(self,book:List[Dict],order:Dict): self.book, self.order=book, order
-    def execute(self): self.book.append(self.order.copy()); return True
+    # `book` is an OrderJournal (O(1) undo by sequence id) or a plain list (legacy)
+    def __init__(self,book,order:Dict): self.book, self.order, self.seq=book, order, None
+    def execute(self):
+        if isinstance(self.book,OrderJournal): self.seq=self.book.add(self.order.copy(),self.seq); return True
+        self.book.append(self.order.copy()); return True
     def undo(self):
+        if isinstance(self.book,OrderJournal): return self.seq is not None and self.book.remove(self.seq)
+        if self.book and self.book[-1]==self.order: self.book.pop(); return True
         if self.order in self.book: self.book.remove(self.order); return True
         return False
+class ExecuteOrdersCommand(Command):
+    # bulk variant: one extend per batch; undo drops the batch's slice if it is still where it was put.
+    # the command owns `orders` (built fresh by the caller), so they go into the book without a copy
+    def __init__(self,book,orders:List[Dict]): self.book, self.orders, self.start, self.seqs=book, orders, None, None
+    def execute(self):
+        if isinstance(self.book,OrderJournal): self.seqs=self.book.add_many(self.orders,self.seqs); return True
+        self.start=len(self.book); self.book.extend(self.orders); return True
+    def undo(self):
+        if isinstance(self.book,OrderJournal): return self.seqs is not None and self.book.remove_many(self.seqs)
+        n=len(self.orders); s=self.start
+        if s is not None and self.book[s:s+n]==self.orders: del self.book[s:s+n]; return True
+        return False
 class CommandInvoker:
-    def __init__(self): self.done: List[Command]=[]; self.undone: List[Command]=[]
+    # max_history caps the undo stack; the oldest commands fall off (their effects stay in the book)
+    def __init__(self,max_history:Optional[int]=None):
+        self.done: deque=deque(maxlen=max_history); self.undone: deque=deque(maxlen=max_history)
     def do(self,cmd:Command):
         if cmd.execute(): self.done.append(cmd); self.undone.clear()
     def undo(self):
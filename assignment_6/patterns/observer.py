@@ -1,17 +1,137 @@
 
-from typing import List, Dict, Protocol
+import threading, time
+from collections import deque
+from typing import List, Dict, Protocol, Optional
 class Observer(Protocol):
     def update(self,signal:Dict): ...
+    # optional: def update_batch(self,signals:List[Dict]): ...
+def coalesce_signals(signals:List[Dict])->List[Dict]:
+    # one signal per (symbol,action): qty summed, "count" = number merged, first-seen order kept
+    out: Dict[tuple,Dict]={}
+    for s in signals:
+        k=(s["symbol"],s["action"]); c=out.get(k)
+        if c is None: c=out[k]=dict(s); c["count"]=1
+        else: c["qty"]+=s["qty"]; c["count"]+=1
+    return list(out.values())
 class SignalPublisher:
     def __init__(self): self._obs: List[Observer]=[]
     def attach(self,o:Observer): self._obs.append(o)
     def detach(self,o:Observer): self._obs.remove(o)
     def notify(self,signal:Dict):
         for o in list(self._obs): o.update(signal)
+    def notify_batch(self,signals:List[Dict]):
+        # one call per observer per batch with the signals as generated; observers without update_batch get
+        # per-signal updates. Observers with coalesce_batches=True opt in to one merged signal per
+        # (symbol,action) instead -- its qty is the batch total, so per-signal checks must not opt in
+        merged=None
+        for o in list(self._obs):
+            sigs=signals
+            if getattr(o,"coalesce_batches",False):
+                if merged is None: merged=coalesce_signals(signals)
+                sigs=merged
+            ub=getattr(o,"update_batch",None)
+            if ub is not None: ub(sigs)
+            else:
+                for s in sigs: o.update(s)
+POLICIES=("block","drop_oldest","coalesce")
+class _Channel:
+    # bounded per-observer queue drained by its own worker thread.
+    # entries are [enqueue_time, signal, merged]; merged is a private copy once coalescing touched it
+    def __init__(self,obs:Observer,maxsize:int,policy:str):
+        if policy not in POLICIES: raise ValueError(f"unknown backpressure policy {policy!r}; expected one of {POLICIES}")
+        self.obs, self.maxsize, self.policy = obs, max(1,int(maxsize)), policy
+        self.q: deque=deque(); self.pending: Dict[tuple,list]={}; self.cv=threading.Condition(); self.busy=False; self.closed=False
+        self.stats={"enqueued":0,"delivered":0,"dropped":0,"coalesced":0,"errors":0,"max_depth":0,"last_lag_s":0.0,"max_lag_s":0.0}
+        self.thread=threading.Thread(target=self._run,daemon=True,name=f"observer-{type(obs).__name__}"); self.thread.start()
+    def put(self,signal:Dict):
+        with self.cv:
+            st=self.stats; st["enqueued"]+=1
+            if len(self.q)>=self.maxsize:
+                if self.policy=="block":
+                    while len(self.q)>=self.maxsize and not self.closed: self.cv.wait()
+                elif self.policy=="coalesce" and self._merge(signal): return
+                else: self._drop_oldest()
+            e=[time.perf_counter(),signal,None]; self.q.append(e)
+            if self.policy=="coalesce": self.pending[(signal.get("symbol"),signal.get("action"))]=e
+            if len(self.q)>st["max_depth"]: st["max_depth"]=len(self.q)
+            self.cv.notify_all()
+    def _merge(self,signal:Dict)->bool:
+        e=self.pending.get((signal.get("symbol"),signal.get("action")))
+        if e is None: return False
+        m=e[2]
+        if m is None: m=e[2]=dict(e[1]); m["count"]=e[1].get("count",1)
+        m["qty"]=m.get("qty",0)+signal.get("qty",0); m["count"]+=signal.get("count",1); self.stats["coalesced"]+=1
+        return True
+    def _drop_oldest(self):
+        e=self.q.popleft(); self.stats["dropped"]+=1
+        k=(e[1].get("symbol"),e[1].get("action"))
+        if self.pending.get(k) is e: del self.pending[k]
+    def _run(self):
+        ub=getattr(self.obs,"update_batch",None)
+        while True:
+            with self.cv:
+                while not self.q and not self.closed: self.cv.wait()
+                if not self.q and self.closed: return
+                batch=list(self.q); self.q.clear(); self.pending.clear(); self.busy=True
+                self.cv.notify_all()
+            now=time.perf_counter(); sigs=[e[2] if e[2] is not None else e[1] for e in batch]; errors=0
+            # an observer that raises must not kill the worker: put() would then block forever under "block"
+            # and flush() never return. Failures are counted per call and draining carries on
+            if ub is not None:
+                try: ub(sigs)
+                except Exception: errors+=1
+            else:
+                for sg in sigs:
+                    try: self.obs.update(sg)
+                    except Exception: errors+=1
+            with self.cv:
+                st=self.stats; st["delivered"]+=len(sigs); st["errors"]+=errors; lag=now-batch[0][0]
+                st["last_lag_s"]=lag; st["max_lag_s"]=max(st["max_lag_s"],lag); self.busy=False; self.cv.notify_all()
+    def flush(self,timeout:Optional[float]=None)->bool:
+        end=None if timeout is None else time.perf_counter()+timeout
+        with self.cv:
+            while self.q or self.busy:
+                left=None if end is None else end-time.perf_counter()
+                if left is not None and left<=0: return False
+                self.cv.wait(left)
+        return True
+    def close(self):
+        with self.cv: self.closed=True; self.cv.notify_all()
+        self.thread.join()
+class AsyncSignalPublisher(SignalPublisher):
+    # notify()/notify_batch() only enqueue; each observer is driven by its own worker thread through a
+    # bounded queue, so tick-path latency no longer depends on the slowest subscriber.
+    # backpressure when a queue is full: "block" waits for room, "drop_oldest" evicts the oldest pending
+    # signal, "coalesce" merges into a pending signal with the same (symbol, action) (else drops oldest)
+    def __init__(self,maxsize:int=1024,policy:str="block"):
+        super().__init__(); self.maxsize, self.policy = maxsize, policy; self._ch: Dict[int,_Channel]={}
+    def attach(self,o:Observer,maxsize:Optional[int]=None,policy:Optional[str]=None):
+        self._ch[id(o)]=_Channel(o,maxsize or self.maxsize,policy or self.policy); self._obs.append(o)
+    def detach(self,o:Observer):
+        self._obs.remove(o); self._ch.pop(id(o)).close()
+    def notify(self,signal:Dict):
+        for c in list(self._ch.values()): c.put(signal)
+    def notify_batch(self,signals:List[Dict]):
+        for c in list(self._ch.values()):
+            for sg in signals: c.put(sg)
+    def flush(self,timeout:Optional[float]=None)->bool:
+        return all([c.flush(timeout) for c in list(self._ch.values())])
+    def close(self):
+        for c in list(self._ch.values()): c.close()
+    def metrics(self)->Dict[str,Dict]:
+        # per observer: counters plus current queue depth ("lag" in signals) and delivery lag in seconds
+        out={}
+        for o in self._obs:
+            c=self._ch[id(o)]
+            with c.cv: out[f"{type(o).__name__}#{id(o):x}"]={**c.stats,"depth":len(c.q),"policy":c.policy}
+        return out
 class LoggerObserver:
     def __init__(self,log_list:List[Dict]): self.log=log_list
     def update(self,signal:Dict): self.log.append(signal)
+    def update_batch(self,signals:List[Dict]): self.log.extend(signals)
 class AlertObserver:
     def __init__(self,threshold_qty=500): self.th=threshold_qty; self.alerts=[]
     def update(self,signal:Dict):
         if abs(signal.get("qty",0))>=self.th: self.alerts.append(signal)
+    def update_batch(self,signals:List[Dict]):
+        th=self.th; self.alerts.extend(s for s in signals if abs(s.get("qty",0))>=th)
@@ -1,16 +1,55 @@
 
-import json, threading
+import json, os, threading
+_MISSING=object()
+def _flatten(data,prefix="",out=None):
+    # every reachable dotted path -> value (intermediate dicts included, so get("a") still returns a dict).
+    # keys that themselves contain "." are skipped: get() splits on "." so they were never reachable
+    out={} if out is None else out
+    if isinstance(data,dict):
+        for k,v in data.items():
+            if not isinstance(k,str) or "." in k: continue
+            key=prefix+k; out[key]=v; _flatten(v,key+".",out)
+    return out
 class Config:
+    # Readers see one immutable (data, flat, mtime) tuple held in a single attribute: load/reload build a
+    # complete new tuple off to the side and swap the reference, so get() never takes a lock and never
+    # observes a half-loaded config. get() is a single dict lookup on the precompiled dotted-key map.
     _inst=None; _lock=threading.Lock()
     def __new__(cls,*a,**k):
         with cls._lock:
-            if cls._inst is None: cls._inst=super().__new__(cls)
+            if cls._inst is None: cls._inst=super().__new__(cls); cls._inst._state=({},{},None); cls._inst._watcher=None
         return cls._inst
-    def load(self,path:str):
-        with open(path,"r") as f: self.data=json.load(f); return self
+    @property
+    def data(self): return self._state[0]
+    @data.setter
+    def data(self,v): self._state=(v,_flatten(v),None)
+    def load(self,path:str,watch:bool=False,interval:float=1.0):
+        self.path=path; self._state=self._read(path)
+        if watch: self.watch(interval)
+        return self
+    @staticmethod
+    def _read(path):
+        mtime=os.stat(path).st_mtime_ns
+        with open(path,"r") as f: data=json.load(f)
+        return (data,_flatten(data),mtime)
+    def reload(self)->bool:
+        # re-read if the file changed; a missing or unparsable file (e.g. mid-write) keeps the current config
+        try:
+            if os.stat(self.path).st_mtime_ns==self._state[2]: return False
+            new=self._read(self.path)
+        except (OSError,ValueError): return False
+        self._state=new; return True
+    def watch(self,interval:float=1.0):
+        # poll the file's mtime from a daemon thread and hot-swap on change
+        if self._watcher is not None: return self
+        stop=threading.Event()
+        def loop():
+            while not stop.wait(interval): self.reload()
+        t=threading.Thread(target=loop,daemon=True,name="config-watch"); t.stop=stop; self._watcher=t; t.start()
+        return self
+    def stop_watch(self):
+        t=self._watcher; self._watcher=None
+        if t is not None: t.stop.set(); t.join()
     def get(self,key,default=None):
-        cur=self.data
-        for part in key.split("."):
-            if isinstance(cur,dict) and part in cur: cur=cur[part]
-            else: return default
-        return cur
+        v=self._state[1].get(key,_MISSING)
+        return default if v is _MISSING else v
@@ -1,37 +1,123 @@
 # assignment_6/patterns/strategy.py
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from collections import deque
+from typing import List, Dict, Iterable
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from ..models import MarketDataPoint
 
+def _prices(ticks: List[MarketDataPoint]) -> np.ndarray:
+    return np.fromiter((t.price for t in ticks), dtype=np.float64, count=len(ticks))
+
 class Strategy(ABC):
     @abstractmethod
     def generate_signals(self, tick: MarketDataPoint) -> List[Dict]: ...
+    def generate_signals_batch(self, ticks: Iterable[MarketDataPoint]) -> List[Dict]:
+        # same signals, in order, as calling generate_signals per tick; subclasses override with a vectorized block.
+        # each signal carries its triggering tick's "price" so batch orders are valued like per-tick ones
+        out = []
+        for t in ticks:
+            for sig in self.generate_signals(t):
+                sig.setdefault("price", t.price); out.append(sig)
+        return out
 
 class MeanReversionStrategy(Strategy):
+    # O(1) per tick, O(window) memory: ring buffer (deque with maxlen) plus a running sum.
+    # The sum is rebuilt from the buffer every `window` evictions so float drift stays bounded.
+    # Signals match a sum(h[-w:]) reference only up to float rounding: the running sum can differ from a
+    # fresh sum in the last bits, so a return landing exactly on +/-threshold (e.g. threshold 0 with flat
+    # prices) may fire in one and not the other. Away from that boundary the signals are identical.
     def __init__(self, lookback=5, threshold=0.02, **kwargs):
         lookback = kwargs.get("lookback_window", kwargs.get("window", lookback))
         threshold = kwargs.get("threshold_pct", kwargs.get("band", threshold))
         self.window = int(lookback)
         self.th = float(threshold)
-        self.h = []
+        self.h = deque(maxlen=self.window)
+        self.total = 0.0
+        self._evicted = 0
+    def _push(self, p):
+        h = self.h
+        if len(h) == self.window:
+            self.total -= h[0]; self._evicted += 1
+        h.append(p); self.total += p
+        if self._evicted >= self.window:
+            self.total = sum(h); self._evicted = 0
     def generate_signals(self, tick: MarketDataPoint):
-        self.h.append(tick.price)
+        self._push(tick.price)
         if len(self.h) < self.window: return []
-        avg = sum(self.h[-self.window:]) / self.window
+        avg = self.total / self.window
         r = tick.price / avg - 1.0
-        if r < -self.th: return [{"action":"BUY","symbol":tick.symbol,"qty":100,"reason":"mr"}]
-        if r >  self.th: return [{"action":"SELL","symbol":tick.symbol,"qty":100,"reason":"mr"}]
+        if r < -self.th: return [{"action":"BUY","symbol":tick.symbol,"qty":100,"price":tick.price,"reason":"mr"}]
+        if r >  self.th: return [{"action":"SELL","symbol":tick.symbol,"qty":100,"price":tick.price,"reason":"mr"}]
         return []
+    def generate_signals_batch(self, ticks):
+        # vectorized over the block: window sums from a cumsum over the carried tail + the block, one
+        # threshold mask, and signal dicts only for the rows that fire. Window sums are cumsum
+        # differences rather than the running sum, so the rounding caveat above applies between modes
+        ticks = ticks if isinstance(ticks, list) else list(ticks)
+        if not ticks: return []
+        w, th = self.window, self.th
+        tail = np.fromiter(self.h, dtype=np.float64, count=len(self.h))
+        px = _prices(ticks)
+        ext = np.concatenate((tail, px))
+        self.h.extend(px[-w:].tolist()); self.total = sum(self.h); self._evicted = 0
+        first = max(w - 1 - len(tail), 0)  # first block row with a full window
+        if first >= len(px): return []
+        cs = np.concatenate(([0.0], np.cumsum(ext)))
+        j = np.arange(len(tail) + first, len(ext))
+        r = px[first:] / ((cs[j + 1] - cs[j + 1 - w]) / w) - 1.0
+        sell = r > th; fire = np.flatnonzero(sell | (r < -th))
+        out = []
+        for i, sl in zip((fire + first).tolist(), sell[fire].tolist()):
+            t = ticks[i]
+            out.append({"action":"SELL" if sl else "BUY","symbol":t.symbol,"qty":100,"price":t.price,"reason":"mr"})
+        return out
 
 class BreakoutStrategy(Strategy):
+    # O(1) amortized per tick, O(window) memory: monotonic deques of (tick index, price) hold the
+    # window high (decreasing) and low (increasing); each price enters and leaves each deque once.
     def __init__(self, lookback=20, **kwargs):
         lookback = kwargs.get("lookback_window", kwargs.get("window", lookback))
         self.window = int(lookback)
-        self.h = []
+        self.n = 0
+        self.hi = deque(); self.lo = deque()
+        self.tail = deque(maxlen=self.window)  # last prices, carried into the next vectorized block
+    def _push(self, p):
+        i, hi, lo = self.n, self.hi, self.lo
+        while hi and hi[-1][1] <= p: hi.pop()
+        hi.append((i, p))
+        while lo and lo[-1][1] >= p: lo.pop()
+        lo.append((i, p))
+        if hi[0][0] <= i - self.window: hi.popleft()
+        if lo[0][0] <= i - self.window: lo.popleft()
+        self.n = i + 1
+        self.tail.append(p)
     def generate_signals(self, tick: MarketDataPoint):
-        self.h.append(tick.price)
-        if len(self.h) < self.window: return []
-        hi = max(self.h[-self.window:]); lo = min(self.h[-self.window:])
-        if tick.price >= hi: return [{"action":"BUY","symbol":tick.symbol,"qty":100,"reason":"bo"}]
-        if tick.price <= lo:  return [{"action":"SELL","symbol":tick.symbol,"qty":100,"reason":"bo"}]
+        self._push(tick.price)
+        if self.n < self.window: return []
+        hi = self.hi[0][1]; lo = self.lo[0][1]
+        if tick.price >= hi: return [{"action":"BUY","symbol":tick.symbol,"qty":100,"price":tick.price,"reason":"bo"}]
+        if tick.price <= lo:  return [{"action":"SELL","symbol":tick.symbol,"qty":100,"price":tick.price,"reason":"bo"}]
         return []
+    def generate_signals_batch(self, ticks):
+        # vectorized over the block: window max/min via sliding_window_view over the last window-1 prices
+        # + the block, compared in one pass; the monotonic deques are rebuilt from the tail afterwards
+        ticks = ticks if isinstance(ticks, list) else list(ticks)
+        if not ticks: return []
+        w, n0 = self.window, self.n
+        px = _prices(ticks)
+        tail = np.fromiter(self.tail, dtype=np.float64, count=len(self.tail))
+        ext = np.concatenate((tail[len(tail) - min(len(tail), w - 1):], px))
+        last = (list(self.tail) + px.tolist())[-w:]
+        self.hi.clear(); self.lo.clear(); self.tail.clear(); self.n = n0 + len(px) - len(last)
+        for p in last: self._push(p)
+        first = max(w - 1 - n0, 0)  # first block row with a full window
+        if first >= len(px): return []
+        win = sliding_window_view(ext, w)[len(ext) - w + 1 - len(px) + first:]
+        p = px[first:]
+        buy = p >= win.max(axis=1); fire = np.flatnonzero(buy | (p <= win.min(axis=1)))
+        out = []
+        for i, b in zip((fire + first).tolist(), buy[fire].tolist()):
+            t = ticks[i]
+            out.append({"action":"BUY" if b else "SELL","symbol":t.symbol,"qty":100,"price":t.price,"reason":"bo"})
+        return out
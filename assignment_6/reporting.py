@@ -1,6 +1,42 @@
 
-from typing import List, Dict
+from typing import List, Dict, Any
 def summarize_orders(book:List[Dict])->Dict[str,int]:
     out={}
     for o in book: out[(o["symbol"],o["action"])]=out.get((o["symbol"],o["action"]),0)+o["qty"]
     return out
+class OrderSummary:
+    # Incremental version of summarize_orders, attached to an OrderJournal as a listener so execute,
+    # undo and redo update it in O(1); snapshot() costs O(keys) instead of rescanning the book.
+    # Notional uses the order's own "price" (Engine orders carry their triggering tick's price), otherwise
+    # the last mark() for its symbol.
+    def __init__(self):
+        self.qty: Dict[tuple,Any]={}; self.count: Dict[tuple,int]={}; self.notional: Dict[tuple,float]={}
+        self._marks: Dict[str,float]={}; self._live: Dict[int,float]={}; self._undone: Dict[int,float]={}
+    def mark(self,symbol:str,price:float): self._marks[symbol]=price
+    def on_add(self,seq:int,order:Dict):
+        k=(order["symbol"],order["action"]); q=order["qty"]
+        n=self._undone.pop(seq,None)  # redo keeps the original notional
+        if n is None:
+            self._undone.clear()  # a fresh order invalidates the redo stack
+            px=order.get("price",self._marks.get(order["symbol"])); n=q*px if px is not None else 0.0
+        self._live[seq]=n
+        self.qty[k]=self.qty.get(k,0)+q; self.count[k]=self.count.get(k,0)+1; self.notional[k]=self.notional.get(k,0.0)+n
+    def on_remove(self,seq:int,order:Dict):
+        k=(order["symbol"],order["action"]); n=self._live.pop(seq,0.0); self._undone[seq]=n
+        c=self.count[k]-1
+        if c==0: del self.qty[k], self.count[k], self.notional[k]; return
+        self.count[k]=c; self.qty[k]-=order["qty"]; self.notional[k]-=n
+    def snapshot(self)->Dict[tuple,Any]:
+        # same shape as summarize_orders(book)
+        return dict(self.qty)
+    def columns(self)->Dict[str,List]:
+        # columnar per-symbol export: buy/sell qty, net qty (buys - sells), order count, notional
+        agg: Dict[str,list]={}
+        for (s,a),q in self.qty.items():
+            r=agg.setdefault(s,[0,0,0,0.0])
+            if a=="BUY": r[0]+=q
+            elif a=="SELL": r[1]+=q
+            r[2]+=self.count[(s,a)]; r[3]+=self.notional[(s,a)]
+        syms=sorted(agg)
+        return {"symbol":syms,"buy_qty":[agg[s][0] for s in syms],"sell_qty":[agg[s][1] for s in syms],
+                "net_qty":[agg[s][0]-agg[s][1] for s in syms],"orders":[agg[s][2] for s in syms],"notional":[agg[s][3] for s in syms]}
@@ -4,3 +4,171 @@ from finm325_assn6.main import run
 def test_run_smoke():
     out=run(str(Path(__file__).resolve().parents[1]))
     assert 'orders' in out
+def test_run_async_observers_from_config(tmp_path,monkeypatch):
+    import json, shutil
+    from finm325_assn6.patterns import observer
+    root=Path(__file__).resolve().parents[1]; shutil.copytree(root/"data",tmp_path/"data")
+    cfg=json.loads((tmp_path/"data"/"config.json").read_text()); cfg["observers"]={"async":True,"queue_size":8,"policy":"block"}
+    (tmp_path/"data"/"config.json").write_text(json.dumps(cfg))
+    made=[]; orig=observer.AsyncSignalPublisher.__init__
+    def init(self,*a,**k): made.append(k); orig(self,*a,**k)
+    monkeypatch.setattr(observer.AsyncSignalPublisher,"__init__",init)
+    out=run(str(tmp_path)); sync=run(str(root))
+    assert made==[{"maxsize":8,"policy":"block"}]
+    assert out["signals_logged"]==len(out["orders"]) and out["orders"]==sync["orders"]
+def test_on_ticks_matches_on_tick():
+    from finm325_assn6.engine import Engine
+    from finm325_assn6.models import MarketDataPoint
+    from finm325_assn6.patterns.observer import SignalPublisher, LoggerObserver, AlertObserver
+    from finm325_assn6.patterns.strategy import MeanReversionStrategy, BreakoutStrategy
+    from finm325_assn6.benchmark import synth_prices
+    ticks=[MarketDataPoint("X",str(i),p) for i,p in enumerate(synth_prices(2000))]
+    for cls in (MeanReversionStrategy, BreakoutStrategy):
+        pa=SignalPublisher(); al_a=AlertObserver(threshold_qty=100); pa.attach(al_a)
+        a=Engine(cls(lookback=10,threshold=0.01),pa); log=[]; pub=SignalPublisher(); pub.attach(LoggerObserver(log))
+        al_b=AlertObserver(threshold_qty=100); al_big=AlertObserver(threshold_qty=101); pub.attach(al_b); pub.attach(al_big)
+        b=Engine(cls(lookback=10,threshold=0.01),pub)
+        for t in ticks: a.on_tick(t)
+        for i in range(0,len(ticks),256): before=len(b.order_book); b.on_ticks(ticks[i:i+256])
+        assert a.order_book==b.order_book and len(a.order_book)>0
+        assert a.summary.columns()["notional"]==b.summary.columns()["notional"]  # valued at each triggering tick
+        assert len(log)==len(b.order_book)
+        # threshold observers see per-signal qty, never batch totals
+        assert al_a.alerts==al_b.alerts and len(al_b.alerts)==len(b.order_book) and al_big.alerts==[]
+        # undo after on_ticks removes the whole last batch
+        assert len(a.order_book)-before>1
+        b.undo_last(); assert b.order_book==a.order_book[:before]
+def test_vectorized_batches_carry_state_across_blocks():
+    from finm325_assn6.models import MarketDataPoint
+    from finm325_assn6.patterns.strategy import MeanReversionStrategy, BreakoutStrategy
+    from finm325_assn6.benchmark import synth_prices
+    ticks=[MarketDataPoint("X",str(i),p) for i,p in enumerate(synth_prices(3000))]
+    for cls in (MeanReversionStrategy, BreakoutStrategy):
+        ref=cls(lookback=10,threshold=0.01); want=[s for t in ticks for s in ref.generate_signals(t)]
+        for size in (1,3,9,10,11,500):  # blocks shorter than, equal to and longer than the window
+            s=cls(lookback=10,threshold=0.01); got=[]
+            for i in range(0,len(ticks),size):
+                blk=ticks[i:i+size]  # alternate with per-tick calls so both paths hand state to each other
+                got+=s.generate_signals_batch(blk) if (i//size)%3 else [g for t in blk for g in s.generate_signals(t)]
+            assert got==want and len(want)>0
+def test_async_publisher_isolates_slow_observer():
+    import time
+    from finm325_assn6.patterns.observer import AsyncSignalPublisher, LoggerObserver
+    class Slow:
+        def __init__(self): self.seen=[]
+        def update(self,s): time.sleep(0.01); self.seen.append(s)
+    pub=AsyncSignalPublisher(maxsize=4,policy="drop_oldest"); slow=Slow(); log=[]
+    pub.attach(slow); pub.attach(LoggerObserver(log),maxsize=1000)
+    t0=time.perf_counter()
+    for i in range(200): pub.notify({"symbol":"X","action":"BUY","qty":1,"i":i})
+    assert time.perf_counter()-t0<0.5
+    assert pub.flush(timeout=5); pub.close()
+    m=list(pub.metrics().values())
+    assert len(log)==200 and m[0]["dropped"]>0 and len(slow.seen)==200-m[0]["dropped"]
+    pub=AsyncSignalPublisher(maxsize=2,policy="coalesce"); slow=Slow(); pub.attach(slow)
+    for i in range(50): pub.notify({"symbol":"X","action":"BUY","qty":1})
+    pub.flush(); pub.close()
+    assert sum(s["qty"] for s in slow.seen)==50
+def test_async_publisher_survives_raising_observer():
+    from finm325_assn6.patterns.observer import AsyncSignalPublisher, LoggerObserver
+    class Broken:
+        def update(self,s): raise RuntimeError("boom")
+    class BrokenBatch:
+        def update_batch(self,sigs): raise RuntimeError("boom")
+    pub=AsyncSignalPublisher(maxsize=2,policy="block"); log=[]
+    pub.attach(Broken()); pub.attach(BrokenBatch()); pub.attach(LoggerObserver(log))
+    for i in range(50): pub.notify({"symbol":"X","action":"BUY","qty":1,"i":i})  # would hang once a worker died
+    pub.notify_batch([{"symbol":"X","action":"SELL","qty":1}]*10)
+    assert pub.flush(timeout=5); pub.close()
+    m=list(pub.metrics().values())
+    assert len(log)==60 and m[0]["errors"]==60 and m[0]["delivered"]==60 and m[1]["errors"]>0 and m[2]["errors"]==0
+def test_rolling_strategies_match_list_reference():
+    from finm325_assn6.benchmark import bench_rolling
+    out=bench_rolling(n=20_000,window=7,check_every=10_000,verify=20_000)
+    for r in out.values(): assert r["mismatches"]==0 and r["traced_bytes"][1]<=r["traced_bytes"][0]+1024
+def test_incremental_decorators_match_full_scan():
+    from finm325_assn6.benchmark import bench_decorators
+    assert bench_decorators(n=5000,polls=10)["max_abs_diff"]<1e-12
+def test_beta_tail_aligns_unequal_series():
+    import random
+    from finm325_assn6.models import Stock, BetaDecorator
+    from finm325_assn6.benchmark import synth_prices, _full_scan_metrics
+    rng=random.Random(5); prices=synth_prices(50); base=[rng.gauss(0,0.01) for _ in range(200)]
+    for n_mr in (20,49,200):
+        mr=base[:n_mr]; s=Stock("X","X"); d=BetaDecorator(s,market_returns=mr)
+        for p in prices: d.add_price(p)
+        assert abs(d.get_metrics()["beta"]-_full_scan_metrics(prices,mr)["beta"])<1e-12
+def test_indexed_adapters(tmp_path):
+    import json, os
+    from finm325_assn6.data_loader import BloombergXMLAdapter, YahooFinanceAdapter
+    x=tmp_path/"b.xml"
+    x.write_text("<data>"+"".join(f'<security symbol="{s}">'+"".join(f"<row><date>d{i}</date><price>{i+k}</price><volume>1</volume></row>" for i in range(5))+"</security>" for k,s in enumerate(["A","B","C"]))+'<security symbol="Z"/></data>')
+    b=BloombergXMLAdapter(x)
+    assert [t.price for t in b.get_data("B")]==[1.0,2.0,3.0,4.0,5.0] and b.get_data("Z")==[] and b.get_data("Q")==[]
+    x.write_text('<data><!-- <security symbol="A"> --><security symbol="AT&amp;T"><row><date>d0</date><price>7</price></row></security>'
+                 '<security symbol="A"><row><date><![CDATA[<security symbol="B">]]></date><price>1</price></row></security></data>')
+    b=BloombergXMLAdapter(x)
+    assert [t.price for t in b.get_data("AT&T")]==[7.0] and [(t.ts,t.price) for t in b.get_data("A")]==[('<security symbol="B">',1.0)]
+    assert b.get_data("B")==[]
+    y=tmp_path/"y.json"; y.write_text(json.dumps({"A":[{"date":"d0","price":1}]}))
+    a=YahooFinanceAdapter(y); assert [t.price for t in a.get_data("A")]==[1.0]
+    y.write_text(json.dumps({"A":[{"date":"d0","price":2},{"date":"d1","price":3}]})); st=os.stat(y); os.utime(y,ns=(st.st_atime_ns,st.st_mtime_ns+10**9))
+    assert [t.price for t in a.get_data("A")]==[2.0,3.0]
+def test_compiled_portfolio_tracks_changes():
+    from finm325_assn6.models import Stock, Position, PortfolioGroup, VolatilityDecorator
+    a=Stock("A","A"); b=Stock("B","B"); a.add_price(10); b.add_price(20)
+    sub=PortfolioGroup("sub").add(Position(b,2,20)); root=PortfolioGroup("root").add(Position(VolatilityDecorator(a),1,10)).add(sub)
+    cp=root.compile()
+    assert cp.value()==50 and cp.value(sub)==40
+    b.add_price(30); assert cp.value()==70
+    root.children[0].quantity=3; assert cp.value()==90
+    sub.add(Position(a,1,10)); assert cp.value(sub)==70 and cp.value()==100 and len(cp.get_positions(sub))==2
+    for _ in range(1000): root.compile()
+    a.add_price(11); assert len(a._listeners)==1 and len(root._listeners)<=2 and cp.value()==104
+def test_discarded_decorators_release_accumulators():
+    from finm325_assn6.models import Stock, VolatilityDecorator, BetaDecorator, DrawdownDecorator
+    s=Stock("S","S"); s.add_price(10); keep=DrawdownDecorator(VolatilityDecorator(s))
+    for _ in range(1000): BetaDecorator(DrawdownDecorator(VolatilityDecorator(s)),[0.01])
+    s.add_price(12); keep.add_price(9)
+    assert len(s._stream.accs)==2 and abs(keep.get_metrics()["max_drawdown"]+0.25)<1e-12
+def test_order_journal_persistence_and_history_cap(tmp_path):
+    from finm325_assn6.patterns.command import OrderJournal, ExecuteOrderCommand, CommandInvoker
+    path=str(tmp_path/"orders.log")
+    j=OrderJournal(path,snapshot_every=5); inv=CommandInvoker(max_history=3)
+    for i in range(12): inv.do(ExecuteOrderCommand(j,{"symbol":"X","action":"BUY","qty":i}))
+    for _ in range(5): inv.undo()
+    assert [o["qty"] for o in j]==list(range(9)) and len(inv.done)==0
+    inv.redo(); assert [o["qty"] for o in j][-1]==9
+    j.close()
+    assert OrderJournal(path).as_list()==j.as_list()
+def test_incremental_order_summary():
+    import random
+    from finm325_assn6.engine import Engine
+    from finm325_assn6.models import MarketDataPoint
+    from finm325_assn6.patterns.observer import SignalPublisher
+    from finm325_assn6.patterns.strategy import MeanReversionStrategy
+    from finm325_assn6.reporting import summarize_orders
+    from finm325_assn6.benchmark import synth_prices
+    e=Engine(MeanReversionStrategy(lookback=5,threshold=0.005),SignalPublisher()); rng=random.Random(0)
+    for i,p in enumerate(synth_prices(3000)):
+        e.on_tick(MarketDataPoint("AB"[i%2],str(i),p))
+        r=rng.random()
+        if r<0.1: e.undo_last()
+        elif r<0.15: e.redo_last()
+    assert e.summary.snapshot()==summarize_orders(e.order_book)
+    book=e.order_book; n=len(book)
+    assert book is e.order_book and not hasattr(book,"append") and book[-1]==list(book)[-1] and book[:3]==list(book)[:3]
+    e.on_tick(MarketDataPoint("A","x",1e9)); assert len(book)==n+1  # live: no re-read needed
+    cols=e.summary.columns()
+    assert sum(cols["orders"])==len(e.order_book) and cols["symbol"]==["A","B"]
+def test_config_flat_lookup_and_reload(tmp_path):
+    import json, os
+    from finm325_assn6.patterns.singleton import Config
+    p=tmp_path/"cfg.json"; p.write_text(json.dumps({"engine":{"strategy":"bo","n":{"x":1}},"a.b":2}))
+    c=Config().load(str(p))
+    assert c is Config() and c.get("engine.strategy")=="bo" and c.get("engine.n")=={"x":1} and c.get("engine.n.x")==1
+    assert c.get("a.b","d")=="d" and c.get("engine.missing",5)==5
+    p.write_text(json.dumps({"engine":{"strategy":"mr"}})); st=os.stat(p); os.utime(p,ns=(st.st_atime_ns,st.st_mtime_ns+10**9))
+    assert c.reload() and c.get("engine.strategy")=="mr" and c.get("engine.n") is None
+    p.write_text("{broken"); os.utime(p,ns=(st.st_atime_ns,st.st_mtime_ns+2*10**9))
+    assert not c.reload() and c.get("engine.strategy")=="mr"
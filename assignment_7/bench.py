@@ -0,0 +1,104 @@
+# bench.py
+import os, threading, time, tracemalloc
+import numpy as np
+import pandas as pd
+import polars as pl
+import psutil
+
+MB = 1024 * 1024
+
+def tree_rss(proc):
+    # RSS of a process plus all of its live descendants (pool workers included). Pages a forked worker
+    # still shares with its parent are counted in both, so this is an upper bound for fork pools
+    total = 0
+    try:
+        total = proc.memory_info().rss
+        kids = proc.children(recursive=True)
+    except psutil.Error:
+        return total
+    for c in kids:
+        try:
+            total += c.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+class PeakRSSSampler:
+    # background thread polling tree_rss every `interval` seconds; a one-shot before/after delta
+    # misses transient peaks and anything allocated inside worker processes
+    def __init__(self, pid=None, interval=0.005):
+        self.proc = psutil.Process(pid or os.getpid())
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, tree_rss(self.proc))
+
+    def __enter__(self):
+        self.baseline = self.peak = tree_rss(self.proc)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, tree_rss(self.proc))
+        return False
+
+    @property
+    def delta_mb(self):
+        return (self.peak - self.baseline) / MB
+
+def result_mb(out):
+    # in-memory size of a result frame (polars reports its Arrow buffers, which tracemalloc can't see)
+    if isinstance(out, pl.DataFrame):
+        return out.estimated_size() / MB
+    if isinstance(out, pd.DataFrame):
+        return out.memory_usage(deep=True).sum() / MB
+    return float("nan")
+
+def measure(fn, *args, warmup=1, repeat=5, mem_repeat=3, trace=False, interval=0.005, **kwargs):
+    # warmup runs are discarded. The `repeat` timed runs carry no instrumentation: the RSS sampler thread
+    # competes for the GIL (~5% on GIL-bound work), so peak memory comes from `mem_repeat` separate
+    # sampled runs, whose times are only used to report the sampler's overhead. trace=True adds one
+    # extra untimed run under tracemalloc (Python-heap peak; slows the run, so it is kept out too)
+    for _ in range(warmup):
+        fn(*args, **kwargs)
+    times, peaks, sampled = [], [], []
+    out = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        out = fn(*args, **kwargs)
+        times.append(time.perf_counter() - t0)
+    for _ in range(max(1, mem_repeat)):
+        with PeakRSSSampler(interval=interval) as s:
+            t0 = time.perf_counter()
+            fn(*args, **kwargs)
+            sampled.append(time.perf_counter() - t0)
+        peaks.append(s.delta_mb)
+    q1, med, q3 = np.percentile(times, [25, 50, 75])
+    stats = {
+        "times_s": times,
+        "median_s": float(med),
+        "iqr_s": float(q3 - q1),
+        "peak_MB": float(max(peaks)),
+        "peak_median_MB": float(np.median(peaks)),
+        "sampler_overhead": float(np.median(sampled) / med - 1.0) if med > 0 else float("nan"),
+        "result_MB": result_mb(out),
+    }
+    if trace:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        fn(*args, **kwargs)
+        stats["py_peak_MB"] = tracemalloc.get_traced_memory()[1] / MB
+        if started:
+            tracemalloc.stop()
+    return out, stats
@@ -0,0 +1,122 @@
+# incremental.py
+import io, json, os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from data_loader import load_pandas
+from metrics import rolling_metrics_arrays, sorted_by_symbol
+
+METRIC_COLS = ["ret","roll_ma_20","roll_std_20","roll_sharpe_20"]
+
+class IncrementalMetrics:
+    # Append-only rolling metrics. Per symbol the state keeps the last timestamp processed and the last
+    # w+1 prices (enough for a full price window and a full window of returns); the running sums are
+    # rebuilt from that tail, so an update costs O(new rows + symbols touched * w) however long the
+    # history is. Each update appends one Parquet partition to out_dir; the state lives in
+    # out_dir/_state.json (the leading underscore keeps Parquet dataset readers from picking it up).
+    def __init__(self, out_dir="outputs/metrics", w=20):
+        self.out_dir = Path(out_dir)
+        self.w = w
+        self.state_path = self.out_dir / "_state.json"
+        self.symbols = {}
+        self.parts = 0
+        self.source = None
+        if self.state_path.exists():
+            with open(self.state_path, encoding="utf-8") as f:
+                st = json.load(f)
+            if st.get("w") == w:
+                self.symbols, self.parts, self.source = st["symbols"], st["parts"], st.get("source")
+
+    def reset(self):
+        for p in self.out_dir.glob("part-*.parquet"):
+            p.unlink()
+        self.symbols, self.parts, self.source = {}, 0, None
+
+    def update(self, df, source=None):
+        # df: new ticks (timestamp, symbol, price). Rows at or before a symbol's last processed timestamp
+        # are dropped as already seen. Returns the metrics for the rows that were kept.
+        df, codes = sorted_by_symbol(df)
+        df["price"] = df["price"].astype("float64")
+        ts = df["timestamp"].to_numpy().astype("datetime64[ns]").view("int64")
+        syms = pd.unique(df["symbol"])  # sorted order, matching codes
+        seen = np.array([self.symbols.get(s, {}).get("ts", np.iinfo(np.int64).min) for s in syms], dtype=np.int64)
+        keep = ts > seen[codes] if len(df) else np.empty(0, dtype=bool)
+        df, ts, codes = df[keep].reset_index(drop=True), ts[keep], codes[keep]
+
+        px = df["price"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(df) else np.empty(0, dtype=int)
+        ends = np.append(starts[1:], len(df))
+        # each symbol's stored tail goes in front of its new rows, so windows continue across updates
+        pieces, tails = [], []
+        for a, b in zip(starts, ends):
+            tail = np.asarray(self.symbols.get(syms[codes[a]], {}).get("prices", []), dtype="float64")
+            pieces += [tail, px[a:b]]
+            tails.append(len(tail))
+        sizes = np.asarray(tails, dtype=int) + (ends - starts)
+        first = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(int)
+        allpx = np.concatenate(pieces) if pieces else np.empty(0)
+        is_start = np.zeros(len(allpx), dtype=bool)
+        is_start[first] = True
+        is_new = np.ones(len(allpx), dtype=bool)
+        for f, t in zip(first, tails):
+            is_new[f:f + t] = False
+        out = rolling_metrics_arrays(allpx, is_start, self.w)
+        for c, col in zip(METRIC_COLS, out):
+            df[c] = col[is_new]
+
+        for k, (a, b) in enumerate(zip(starts, ends)):
+            e = first[k] + sizes[k]
+            self.symbols[syms[codes[a]]] = {"ts": int(ts[b - 1]), "prices": allpx[max(first[k], e - self.w - 1):e].tolist()}
+        if source is not None:
+            self.source = source
+        if len(df):
+            self._write_part(df)
+        self._save()
+        return df
+
+    def update_from_csv(self, path):
+        # parses only the bytes appended since the last call (up to the last complete line); a file that
+        # shrank or whose header changed is treated as rewritten and rebuilt from scratch
+        path = os.path.abspath(str(path))
+        with open(path, "rb") as f:
+            header = f.readline()
+            src = self.source
+            if (src is None or src["path"] != path or src["header"] != header.decode("utf-8")
+                    or os.fstat(f.fileno()).st_size < src["offset"]):
+                self.reset()
+                offset = len(header)
+            else:
+                offset = src["offset"]
+            f.seek(offset)
+            chunk = f.read()
+        chunk = chunk[:chunk.rfind(b"\n") + 1]
+        source = {"path": path, "header": header.decode("utf-8"), "offset": offset + len(chunk)}
+        if not chunk:
+            self.source = source
+            self._save()
+            return pd.DataFrame(columns=["timestamp","symbol","price"] + METRIC_COLS)
+        return self.update(load_pandas(io.BytesIO(header + chunk)), source)
+
+    def read_all(self):
+        parts = sorted(self.out_dir.glob("part-*.parquet"))
+        if not parts:
+            return pd.DataFrame(columns=["timestamp","symbol","price"] + METRIC_COLS)
+        df = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+        return df.sort_values(["symbol","timestamp"]).reset_index(drop=True)
+
+    def _write_part(self, df):
+        # the part number is only advanced in the saved state, so a crash before _save() makes the
+        # next run overwrite this partition rather than duplicate it
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        p = self.out_dir / f"part-{self.parts:05d}.parquet"
+        tmp = p.with_suffix(".tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, p)
+        self.parts += 1
+
+    def _save(self):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"w": self.w, "parts": self.parts, "source": self.source, "symbols": self.symbols}, f)
+        os.replace(tmp, self.state_path)
@@ -1,25 +1,28 @@
 # main.py
-import time, psutil, os, json
+import json
 from pathlib import Path
 import numpy as np
-from data_loader import load_pandas, load_polars
-from metrics import compute_metrics_pandas, compute_metrics_polars
+from data_loader import load_pandas, load_polars, convert
+from metrics import compute_metrics_pandas, compute_metrics_polars, compute_metrics_polars_lazy, compute_metrics_numpy
 from parallel import (
     parallel_pandas_thread, parallel_pandas_process,
     parallel_polars_thread, parallel_polars_process,
 )
 from portfolio import aggregate
 from reporting import Report
-
-proc = psutil.Process(os.getpid())
+import time
+from bench import measure, PeakRSSSampler
+from incremental import IncrementalMetrics
 
 def time_and_mem(fn, *args, **kwargs):
-    t0 = time.perf_counter()
-    rss0 = proc.memory_info().rss
-    out = fn(*args, **kwargs)
-    dt = time.perf_counter() - t0
-    dmem = (proc.memory_info().rss - rss0) / (1024*1024)
-    return out, dt, dmem
+    # exactly one call: (result, seconds, peak MB over the process tree). fn may be stateful (incremental
+    # mode consumes new rows), so time and memory come from the same run and the sampler's small overhead
+    # is included in the time; use measure() for repeated, sampler-free timings of pure functions
+    with PeakRSSSampler() as s:
+        t0 = time.perf_counter()
+        out = fn(*args, **kwargs)
+        dt = time.perf_counter() - t0
+    return out, dt, s.delta_mb
 
 def np_encoder(o):
     if isinstance(o, (np.floating, np.integer)):
@@ -30,40 +33,101 @@ def np_encoder(o):
         return o.tolist()
     raise TypeError
 
-def main():
+def main(warmup=1, repeat=5, trace=False):
     rep = Report()
+    Path("outputs").mkdir(exist_ok=True)
+    rep.meta.update({"warmup": warmup, "repeat": repeat})
+    run = lambda fn, *a, **k: measure(fn, *a, warmup=warmup, repeat=repeat, trace=trace, **k)
+
+    pdf, st_pd = run(load_pandas, "market_data-1.csv")
+    pld, st_pl = run(load_polars, "market_data-1.csv")
+    rep.add_measure("ingest", st_pd, st_pl)
+    # same data from typed columnar copies (converted once, reused while newer than the CSV)
+    for fmt in ("parquet", "feather"):
+        path = convert("market_data-1.csv", fmt, f"outputs/market_data-1.{fmt}")
+        _, st_pd = run(load_pandas, path)
+        _, st_pl = run(load_polars, path)
+        rep.add_measure(f"ingest_{fmt}", st_pd, st_pl)
+
+    mp_seq, st_pd = run(compute_metrics_pandas, pdf)
+    ml_seq, st_pl = run(compute_metrics_polars, pld)
+    rep.add_measure("rolling_seq", st_pd, st_pl)
 
-    pdf, t_pd, m_pd = time_and_mem(load_pandas, "market_data-1.csv")
-    pld, t_pl, m_pl = time_and_mem(load_polars, "market_data-1.csv")
-    rep.add_row("ingest_time_s", t_pd, t_pl)
-    rep.add_row("ingest_mem_MB", m_pd, m_pl)
+    # one-sort cumulative-sum kernel on the same pandas frame
+    _, st_np = run(compute_metrics_numpy, pdf)
+    rep.add_measure("rolling_numpy_kernel", st_np, None)
 
-    mp_seq, t_pd, m_pd = time_and_mem(compute_metrics_pandas, pdf)
-    ml_seq, t_pl, m_pl = time_and_mem(compute_metrics_polars, pld)
-    rep.add_row("rolling_seq_time_s", t_pd, t_pl)
-    rep.add_row("rolling_seq_mem_MB", m_pd, m_pl)
+    # single lazy plan vs the eager with_columns chain above; then scan + metrics fused end to end
+    _, st_pl = run(compute_metrics_polars_lazy, pld)
+    rep.add_measure("rolling_lazy", None, st_pl)
+    _, st_pl = run(compute_metrics_polars_lazy, "market_data-1.csv", streaming=True)
+    rep.add_measure("scan_rolling_streaming", None, st_pl)
 
-    mp_thr, t_pd, m_pd = time_and_mem(parallel_pandas_thread, pdf)
-    ml_thr, t_pl, m_pl = time_and_mem(parallel_polars_thread, pld)
-    rep.add_row("rolling_thread_time_s", t_pd, t_pl)
-    rep.add_row("rolling_thread_mem_MB", m_pd, m_pl)
+    mp_thr, st_pd = run(parallel_pandas_thread, pdf)
+    ml_thr, st_pl = run(parallel_polars_thread, pld)
+    rep.add_measure("rolling_thread", st_pd, st_pl)
 
-    mp_proc, t_pd, m_pd = time_and_mem(parallel_pandas_process, pdf, max_workers=4)
-    ml_proc, t_pl, m_pl = time_and_mem(parallel_polars_process, pld, max_workers=4)
-    rep.add_row("rolling_process_time_s", t_pd, t_pl)
-    rep.add_row("rolling_process_mem_MB", m_pd, m_pl)
+    # peak memory here includes the worker processes (the sampler walks the process tree)
+    u_pd, u_pl = {}, {}
+    mp_proc, st_pd = run(parallel_pandas_process, pdf, max_workers=4, stats=u_pd)
+    ml_proc, st_pl = run(parallel_polars_process, pld, max_workers=4, stats=u_pl)
+    rep.add_measure("rolling_process", st_pd, st_pl)
+    # busy / wall per worker process for the row-balanced batches (last timed run)
+    u_pd, u_pl = u_pd.get("utilization", []), u_pl.get("utilization", [])
+    for i in range(max(len(u_pd), len(u_pl))):
+        rep.add_row(f"rolling_process_worker{i}_util",
+                    u_pd[i] if i < len(u_pd) else float("nan"),
+                    u_pl[i] if i < len(u_pl) else float("nan"))
 
     with open("portfolio_structure-1.json") as f:
         port = json.load(f)
-    port_out, t_pd, m_pd = time_and_mem(aggregate, port, mp_proc)
-    rep.add_row("portfolio_time_s", t_pd, float("nan"))
-    rep.add_row("portfolio_mem_MB", m_pd, float("nan"))
+    port_out, st_pd = run(aggregate, port, mp_proc)
+    rep.add_measure("portfolio", st_pd, None)
 
-    Path("outputs").mkdir(exist_ok=True)
     with open("outputs/portfolio_result.json", "w") as f:
         json.dump(port_out, f, indent=2, default=np_encoder)
 
     rep.write()
 
+def synthetic_frame(n_rows, n_symbols, seed=0):
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    sym = rng.integers(0, n_symbols, n_rows)
+    price = 100.0 + rng.normal(0, 1.0, n_rows)
+    return pd.DataFrame({
+        "timestamp": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(n_rows), unit="s"),
+        "symbol": np.char.add("S", sym.astype(str)).astype(object),
+        "price": price.astype("float32"),
+    })
+
+def kernel_bench(n_rows=10_000_000, n_symbols=5_000):
+    # groupby().rolling() vs the cumulative-sum kernel on a large synthetic universe
+    df = synthetic_frame(n_rows, n_symbols)
+    a, t_pd, m_pd = time_and_mem(compute_metrics_pandas, df)
+    b, t_np, m_np = time_and_mem(compute_metrics_numpy, df)
+    diff = max(float(np.nanmax(np.abs(a[c].to_numpy() - b[c].to_numpy()))) for c in ["roll_ma_20","roll_std_20"])
+    rep = Report("kernel_report.md")
+    rep.add_row(f"rolling_time_s ({n_rows} rows, {n_symbols} symbols)", t_pd, t_np)
+    rep.add_row("rolling_mem_MB", m_pd, m_np)
+    rep.add_row("max_abs_diff", 0.0, diff)
+    rep.df.columns = ["metric", "pandas_groupby", "numpy_kernel"]
+    rep.write()
+
 if __name__ == "__main__":
-    main()
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("mode", nargs="?", default="report", choices=["report", "kernel", "incremental"])
+    ap.add_argument("sizes", nargs="*", type=int, help="kernel: rows symbols")
+    ap.add_argument("--csv", default="market_data-1.csv", help="incremental: tick file to follow")
+    ap.add_argument("--warmup", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--trace", action="store_true", help="extra tracemalloc run per measurement")
+    args = ap.parse_args()
+    if args.mode == "kernel":
+        kernel_bench(*args.sizes[:2])
+    elif args.mode == "incremental":
+        # metrics for rows appended since the last run only -> new partition under outputs/metrics
+        new, dt, mem = time_and_mem(IncrementalMetrics().update_from_csv, args.csv)
+        print(f"incremental: {len(new)} new rows in {dt:.3f}s, peak {mem:.1f} MB")
+    else:
+        main(args.warmup, args.repeat, args.trace)
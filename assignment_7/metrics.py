@@ -1,11 +1,12 @@
 # metrics.py
+import numpy as np
 import pandas as pd
 import polars as pl
 
 def compute_metrics_pandas(df):
     df = df.sort_values(["symbol","timestamp"]).reset_index(drop=True)
     df["price"] = df["price"].astype("float64")
-    g = df.groupby("symbol", group_keys=False)
+    g = df.groupby("symbol", group_keys=False, observed=True)
     df["ret"] = g["price"].pct_change()
     ma = g["price"].rolling(20, min_periods=20).mean().reset_index(level=0, drop=True)
     std = g["ret"].rolling(20, min_periods=20).std(ddof=1).reset_index(level=0, drop=True)
@@ -15,6 +16,70 @@ def compute_metrics_pandas(df):
     df["roll_sharpe_20"] = mean_ret / std
     return df
 
+def _rolling_sum(x, w, valid):
+    # windowed sums from one cumulative sum; rows flagged invalid (window crosses a group start) stay NaN
+    c = np.empty(len(x) + 1)
+    c[0] = 0.0
+    np.cumsum(x, out=c[1:])
+    out = np.full(len(x), np.nan)
+    i = np.flatnonzero(valid)
+    out[i] = c[i + 1] - c[i + 1 - w]
+    return out
+
+def sorted_by_symbol(df):
+    # (df sorted by symbol then timestamp, integer symbol code per row). Sorting on integer keys with
+    # np.lexsort avoids sort_values factorizing the object columns; lexsort is stable like sort_values.
+    codes = pd.factorize(df["symbol"], sort=True)[0]
+    ts = df["timestamp"].to_numpy()
+    if np.issubdtype(ts.dtype, np.datetime64) or np.issubdtype(ts.dtype, np.number):
+        order = np.lexsort((ts, codes))
+        return df.take(order).reset_index(drop=True), codes[order]
+    df = df.sort_values(["symbol","timestamp"]).reset_index(drop=True)
+    return df, pd.factorize(df["symbol"])[0]
+
+def compute_metrics_numpy(df, w=20):
+    # Same output as compute_metrics_pandas without groupby().rolling(): sort once, find symbol
+    # boundaries, then every metric is a cumulative-sum difference masked at group starts.
+    df, codes = sorted_by_symbol(df)
+    df["price"] = df["price"].astype("float64")
+    is_start = np.empty(len(df), dtype=bool)
+    if len(df):
+        is_start[0] = True
+        np.not_equal(codes[1:], codes[:-1], out=is_start[1:])
+    ret, ma, std, sharpe = rolling_metrics_arrays(df["price"].to_numpy(), is_start, w)
+    df["ret"] = ret
+    df["roll_ma_20"] = ma
+    df["roll_std_20"] = std
+    df["roll_sharpe_20"] = sharpe
+    return df
+
+def rolling_metrics_arrays(px, is_start, w=20, out=None):
+    # ret / rolling ma / std / sharpe for prices laid out group by group (is_start marks each group's
+    # first row). `out` may be a preallocated (4, n) float64 array, e.g. a shared-memory block.
+    n = len(px)
+    if out is None:
+        out = np.empty((4, n))
+    ret, ma, std, sharpe = out
+    starts = np.flatnonzero(is_start)
+    first = np.repeat(starts, np.diff(np.append(starts, n)))
+    pos = np.arange(n) - first
+
+    ret[:] = np.nan
+    ret[1:][~is_start[1:]] = px[1:][~is_start[1:]] / px[:-1][~is_start[1:]] - 1.0
+    r0 = np.where(is_start, 0.0, ret)
+
+    # prices are shifted by their group's first price so the running sum stays small (less cancellation)
+    base = px[first]
+    ma[:] = _rolling_sum(px - base, w, pos >= w - 1) / w + base
+    ok = pos >= w  # ret is NaN on the first row of a group, so a full ret window needs w more rows
+    s1 = _rolling_sum(r0, w, ok)
+    s2 = _rolling_sum(r0 * r0, w, ok)
+    mean_ret = s1 / w
+    np.sqrt(np.maximum((s2 - s1 * mean_ret) / (w - 1), 0.0), out=std)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(mean_ret, std, out=sharpe)
+    return out
+
 def compute_metrics_pandas_symbol(g):
     g = g.sort_values(["symbol","timestamp"]).reset_index(drop=True).copy()
     g["price"] = g["price"].astype("float64")
@@ -39,3 +104,41 @@ def compute_metrics_polars(df):
          pl.col("ret").rolling_std(20, ddof=1, min_samples=20).over("symbol")).alias("roll_sharpe_20")
     )
     return df
+
+def metrics_polars_lazy(lf):
+    # Whole metric set as one lazy plan: ret is defined once, the rolling mean/std of ret are computed
+    # once and reused for the Sharpe ratio, and nothing is materialized until collect().
+    w = 20
+    ret_mean = pl.col("ret").rolling_mean(w, min_samples=w).over("symbol")
+    return (
+        lf.sort(["symbol","timestamp"])
+        .with_columns(pl.col("price").cast(pl.Float64))
+        .with_columns(pl.col("price").pct_change().over("symbol").alias("ret"))
+        .with_columns([
+            pl.col("price").rolling_mean(w, min_samples=w).over("symbol").alias("roll_ma_20"),
+            pl.col("ret").rolling_std(w, ddof=1, min_samples=w).over("symbol").alias("roll_std_20"),
+            ret_mean.alias("_ret_mean_20"),
+        ])
+        .with_columns((pl.col("_ret_mean_20") / pl.col("roll_std_20")).alias("roll_sharpe_20"))
+        .drop("_ret_mean_20")
+    )
+
+def _collect(lf, streaming):
+    if not streaming:
+        return lf.collect()
+    try:
+        return lf.collect(engine="streaming")
+    except TypeError:  # older polars
+        return lf.collect(streaming=True)
+
+def compute_metrics_polars_lazy(data, streaming=False):
+    # data: polars DataFrame / LazyFrame, or a .csv/.parquet path (scanned lazily, so inputs larger
+    # than RAM can be processed with streaming=True)
+    if isinstance(data, pl.DataFrame):
+        lf = data.lazy()
+    elif isinstance(data, pl.LazyFrame):
+        lf = data
+    else:
+        from data_loader import scan_polars
+        lf = scan_polars(data)
+    return _collect(metrics_polars_lazy(lf), streaming)
@@ -1,39 +1,109 @@
 # parallel.py
-import os, tempfile
+import atexit, heapq, os, tempfile, time
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
 import pandas as pd
 import polars as pl
-from metrics import compute_metrics_pandas_symbol, compute_metrics_polars
+from data_loader import scan_polars
+from metrics import compute_metrics_pandas_symbol, compute_metrics_polars, rolling_metrics_arrays, sorted_by_symbol
 
-_PDF = None
-_PL_PATH = None
+_SHM = None
+_PL_POOL = None
 
-def _set_pdf(df):
-    global _PDF
-    _PDF = df
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # python < 3.13 has no track flag
+        return shared_memory.SharedMemory(name=name)
 
-def _set_pl_path(path):
+def _set_shm(in_name, out_name, n):
+    # worker side: map the parent's blocks once; the arrays are views, nothing is copied
+    global _SHM
+    inp, out = _attach(in_name), _attach(out_name)
+    _SHM = (inp, out,
+            np.ndarray((n,), dtype=np.float64, buffer=inp.buf),
+            np.ndarray((n,), dtype=np.bool_, buffer=inp.buf, offset=8 * n),
+            np.ndarray((4, n), dtype=np.float64, buffer=out.buf))
+
+def _set_pl_worker():
     os.environ["POLARS_MAX_THREADS"] = "1"
-    global _PL_PATH
-    _PL_PATH = path
 
-def _chunks(lst, k):
-    k = max(1, k)
-    m = (len(lst) + k - 1) // k
-    return [lst[i:i+m] for i in range(0, len(lst), m)]
+def _polars_pool(w):
+    # spawned workers (forking a process that has polars loaded is unsafe) are kept across calls so
+    # repeated runs don't pay process start-up and the polars import again
+    global _PL_POOL
+    if _PL_POOL is not None and _PL_POOL[0] != w:
+        shutdown_pools()
+    if _PL_POOL is None:
+        ex = ProcessPoolExecutor(max_workers=w, mp_context=mp.get_context("spawn"), initializer=_set_pl_worker)
+        _PL_POOL = (w, ex)
+    return _PL_POOL[1]
 
-def _compute_pd_syms(syms):
-    parts = []
-    for s in syms:
-        g = _PDF[_PDF["symbol"] == s]
-        parts.append(compute_metrics_pandas_symbol(g))
-    return pd.concat(parts, ignore_index=True) if parts else _PDF.iloc[0:0].copy()
+def shutdown_pools():
+    global _PL_POOL
+    if _PL_POOL is not None:
+        _PL_POOL[1].shutdown()
+        _PL_POOL = None
 
-def _compute_pl_syms(syms):
-    lf = pl.scan_parquet(_PL_PATH) if _PL_PATH.endswith(".parquet") else pl.scan_csv(_PL_PATH)
-    df = lf.filter(pl.col("symbol").is_in(syms)).collect()
-    return compute_metrics_polars(df)
+atexit.register(shutdown_pools)
+
+def _lpt_batches(sizes, k):
+    # Longest-processing-time-first: symbols (row counts in `sizes`, laid out back to back) are taken
+    # largest first and each goes to the currently lightest batch, so a few heavy symbols can't pile
+    # onto one worker. Returns each batch as (offset, length) spans in row order, neighbours merged.
+    bounds = np.concatenate(([0], np.cumsum(sizes)))
+    k = max(1, min(k, len(sizes)))
+    heap = [(0, i) for i in range(k)]
+    members = [[] for _ in range(k)]
+    for g in np.argsort(sizes, kind="stable")[::-1]:
+        load, i = heapq.heappop(heap)
+        members[i].append(int(g))
+        heapq.heappush(heap, (load + int(sizes[g]), i))
+    batches = []
+    for m in members:
+        spans = []
+        for g in sorted(m):
+            o, l = int(bounds[g]), int(sizes[g])
+            if spans and spans[-1][0] + spans[-1][1] == o:
+                spans[-1] = (spans[-1][0], spans[-1][1] + l)
+            else:
+                spans.append((o, l))
+        batches.append(spans)
+    return batches
+
+def _record_stats(stats, busy, wall):
+    # busy: [(pid, seconds)] per task -> per-worker busy time and utilization (busy / wall)
+    if stats is None:
+        return
+    per = {}
+    for pid, t in busy:
+        per[pid] = per.get(pid, 0.0) + t
+    stats["wall_s"] = wall
+    stats["busy_s"] = list(per.values())
+    stats["utilization"] = [t / wall if wall > 0 else float("nan") for t in per.values()]
+
+def _compute_pd_spans(spans):
+    # each span holds whole symbols; results go straight into the shared output block.
+    # several spans are gathered into one kernel call (worker-local copy) rather than one call per span
+    t0 = time.perf_counter()
+    _, _, px, is_start, out = _SHM
+    if len(spans) == 1:
+        o, l = spans[0]
+        rolling_metrics_arrays(px[o:o+l], is_start[o:o+l], out=out[:, o:o+l])
+    else:
+        idx = np.concatenate([np.arange(o, o + l) for o, l in spans])
+        out[:, idx] = rolling_metrics_arrays(px[idx], is_start[idx])
+    return os.getpid(), time.perf_counter() - t0
+
+def _compute_pl_spans(task):
+    # the IPC file is uncompressed, so polars memory-maps it and the pushed-down slices read only these rows
+    t0 = time.perf_counter()
+    path, spans = task
+    lf = pl.scan_ipc(path)
+    df = compute_metrics_polars(pl.concat([lf.slice(o, l) for o, l in spans]).collect())
+    return os.getpid(), time.perf_counter() - t0, df
 
 def parallel_pandas_thread(df, max_workers=None):
     syms = df["symbol"].unique().tolist()
@@ -43,36 +113,68 @@ def parallel_pandas_thread(df, max_workers=None):
         res = list(ex.map(compute_metrics_pandas_symbol, parts))
     return pd.concat(res, ignore_index=True)
 
-def parallel_pandas_process(df, max_workers=None):
-    syms = df["symbol"].unique().tolist()
-    w = max_workers or min(os.cpu_count() or 1, len(syms), 4)
-    batches = _chunks(syms, w)
-    with ProcessPoolExecutor(max_workers=w, initializer=_set_pdf, initargs=(df,)) as ex:
-        res = list(ex.map(_compute_pd_syms, batches, chunksize=1))
-    return pd.concat(res, ignore_index=True)
+def parallel_pandas_process(df, max_workers=None, stats=None):
+    # The frame is sorted by symbol once and its price column (plus group-start flags) is placed in
+    # shared memory; workers get (offset, length) spans covering whole symbols and write ret/ma/std/
+    # sharpe into a shared (4, n) output block, so only span tuples cross the process boundary.
+    # Batches are balanced by row count (_lpt_batches). Pass a dict as `stats` to get per-worker
+    # busy time and utilization.
+    df, codes = sorted_by_symbol(df)
+    df["price"] = df["price"].astype("float64")
+    n = len(df)
+    if n == 0:
+        for c in ["ret","roll_ma_20","roll_std_20","roll_sharpe_20"]:
+            df[c] = np.empty(0)
+        return df
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    bounds = np.append(starts, n)
+    w = max_workers or min(os.cpu_count() or 1, len(starts))
+    batches = _lpt_batches(np.diff(bounds), w)
+    inp = shared_memory.SharedMemory(create=True, size=9 * n)
+    out = shared_memory.SharedMemory(create=True, size=32 * n)
+    try:
+        px = np.ndarray((n,), dtype=np.float64, buffer=inp.buf)
+        is_start = np.ndarray((n,), dtype=np.bool_, buffer=inp.buf, offset=8 * n)
+        px[:] = df["price"].to_numpy()
+        is_start[:] = False
+        is_start[starts] = True
+        with ProcessPoolExecutor(max_workers=w, initializer=_set_shm, initargs=(inp.name, out.name, n)) as ex:
+            t0 = time.perf_counter()
+            busy = list(ex.map(_compute_pd_spans, batches, chunksize=1))
+            _record_stats(stats, busy, time.perf_counter() - t0)
+        res = np.ndarray((4, n), dtype=np.float64, buffer=out.buf)
+        for c, col in zip(["ret","roll_ma_20","roll_std_20","roll_sharpe_20"], res):
+            df[c] = col.copy()
+        del px, is_start, res, col  # views must go before the blocks can be closed
+    finally:
+        for shm in (inp, out):
+            shm.close()
+            shm.unlink()
+    return df
 
 def parallel_polars_thread(df, max_workers=None):
     return compute_metrics_polars(df)
 
-def parallel_polars_process(data, max_workers=None):
-    if isinstance(data, pl.DataFrame):
-        tmp = tempfile.NamedTemporaryFile(suffix=".parquet", delete=False)
-        path = tmp.name
-        tmp.close()
-        data.write_parquet(path)
-        cleanup = True
-    else:
-        path = os.path.abspath(str(data))
-        cleanup = False
-    syms = (pl.read_parquet(path, columns=["symbol"]) if path.endswith(".parquet")
-            else pl.read_csv(path, columns=["symbol"])).get_column("symbol").unique().to_list()
-    w = max_workers or min(os.cpu_count() or 1, len(syms), 4)
-    batches = _chunks(syms, w)
-    ctx = mp.get_context("spawn")
-    with ProcessPoolExecutor(max_workers=w, mp_context=ctx, initializer=_set_pl_path, initargs=(path,)) as ex:
-        res = list(ex.map(_compute_pl_syms, batches, chunksize=1))
-    out = pl.concat(res)
-    if cleanup:
+def parallel_polars_process(data, max_workers=None, stats=None):
+    # data: polars DataFrame or a .csv/.parquet path. It is written once, sorted by symbol, to an
+    # uncompressed Arrow IPC file; each task is (path, spans) for a row-balanced batch of whole symbols
+    # (_lpt_batches), and workers memory-map the file and slice their rows instead of rescanning and
+    # filtering. `stats` as in parallel_pandas_process.
+    df = data if isinstance(data, pl.DataFrame) else scan_polars(data).collect()
+    df = df.sort(["symbol","timestamp"])
+    counts = df.group_by("symbol", maintain_order=True).len().get_column("len").to_list()
+    if not counts:
+        return compute_metrics_polars(df)
+    w = max_workers or min(os.cpu_count() or 1, len(counts))
+    fd, path = tempfile.mkstemp(suffix=".arrow")
+    os.close(fd)
+    try:
+        df.write_ipc(path, compression="uncompressed")
+        tasks = [(path, spans) for spans in _lpt_batches(np.asarray(counts), w)]
+        t0 = time.perf_counter()
+        res = list(_polars_pool(w).map(_compute_pl_spans, tasks, chunksize=1))
+        _record_stats(stats, [(pid, t) for pid, t, _ in res], time.perf_counter() - t0)
+    finally:
         try: os.remove(path)
         except OSError: pass
-    return out
+    return pl.concat([df for _, _, df in res])
@@ -12,18 +12,34 @@ def compute_position(df, symbol, qty):
     draw = (cum / cum.cummax() - 1).min()
     return value, vol, draw
 
-def aggregate(port, df):
+def symbol_stats(df):
+    # compute_position for every symbol at once: one grouped pass over the frame (rows in frame order
+    # within each symbol) -> symbol: (last price, return volatility, max drawdown)
+    px = df["price"].astype("float64")
+    g = px.groupby(df["symbol"], sort=False, observed=True)
+    ret = px / g.shift() - 1
+    gr = ret.groupby(df["symbol"], sort=False, observed=True)
+    cum = (1 + ret).groupby(df["symbol"], sort=False, observed=True).cumprod()
+    draw = (cum / cum.groupby(df["symbol"], sort=False, observed=True).cummax() - 1).groupby(df["symbol"], sort=False, observed=True).min()
+    last, vol = g.last(), gr.std()
+    return dict(zip(last.index, zip(last.to_numpy(), vol.to_numpy(), draw.to_numpy())))
+
+def aggregate(port, df, stats=None):
+    # the metrics frame is reduced once (symbol_stats); walking the tree is then dict lookups only
+    if stats is None:
+        stats = symbol_stats(df)
     vals = []
     vols = []
     draws = []
     for p in port.get("positions", []):
-        v, s, d = compute_position(df, p["symbol"], p["quantity"])
+        price, s, d = stats[p["symbol"]]
+        v = price * p["quantity"]
         vals.append(v); vols.append(s); draws.append(d)
         p["value"] = v
         p["volatility"] = s
         p["drawdown"] = d
     for sp in port.get("sub_portfolios", []):
-        aggregate(sp, df)
+        aggregate(sp, df, stats)
         vals.append(sp["total_value"])
         vols.append(sp["aggregate_volatility"])
         draws.append(sp["max_drawdown"])
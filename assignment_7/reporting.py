@@ -1,19 +1,57 @@
 # reporting.py
+import json, math, os, platform, time
 import pandas as pd
 from pathlib import Path
 
+def _clean(v):
+    # JSON has no NaN; numpy scalars -> Python
+    if hasattr(v, "item"):
+        v = v.item()
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    if isinstance(v, dict):
+        return {k: _clean(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_clean(x) for x in v]
+    return v
+
 class Report:
     def __init__(self, out_md="performance_report.md"):
         self.out_md = out_md
         self.df = pd.DataFrame(columns=["metric","pandas","polars"])
+        self.details = {}
+        self.meta = {}
 
     def add_row(self, metric, pandas_value, polars_value):
         i = len(self.df)
         self.df.loc[i] = [metric, pandas_value, polars_value]
 
+    def add_measure(self, name, pandas_stats=None, polars_stats=None):
+        # stats dicts from bench.measure; either side may be None (not measured)
+        nan = float("nan")
+        get = lambda st, k: st.get(k, nan) if st else nan
+        self.add_row(f"{name}_time_s", get(pandas_stats, "median_s"), get(polars_stats, "median_s"))
+        self.add_row(f"{name}_time_iqr_s", get(pandas_stats, "iqr_s"), get(polars_stats, "iqr_s"))
+        self.add_row(f"{name}_mem_MB", get(pandas_stats, "peak_MB"), get(polars_stats, "peak_MB"))
+        self.details[name] = {"pandas": pandas_stats, "polars": polars_stats}
+
+    def to_json(self):
+        return _clean({
+            "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            **self.meta,
+            "rows": self.df.to_dict("records"),
+            "details": self.details,
+        })
+
     def write(self):
         Path(self.out_md).parent.mkdir(parents=True, exist_ok=True)
         with open(self.out_md, "w", encoding="utf-8") as f:
             f.write("# Performance Report\n\n")
             f.write(self.df.to_markdown(index=False))
             f.write("\n")
+        # same numbers in machine-readable form, so runs can be diffed
+        with open(Path(self.out_md).with_suffix(".json"), "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2)
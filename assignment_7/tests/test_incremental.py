@@ -0,0 +1,24 @@
+import numpy as np
+from data_loader import load_pandas
+from metrics import compute_metrics_pandas
+from incremental import IncrementalMetrics
+
+def test_incremental_appends_match_full_recompute(tmp_path):
+    pdf = load_pandas("market_data-1.csv").sort_values("timestamp", kind="stable").reset_index(drop=True)
+    csv = tmp_path / "ticks.csv"
+    cut = [0, len(pdf) * 6 // 10, len(pdf) * 9 // 10, len(pdf)]
+    pdf.iloc[:cut[1]].to_csv(csv, index=False)
+    inc = IncrementalMetrics(tmp_path / "metrics")
+    assert len(inc.update_from_csv(csv)) == cut[1]
+    for a, b in zip(cut[1:], cut[2:]):
+        pdf.iloc[a:b].to_csv(csv, mode="a", header=False, index=False)
+        # a fresh instance resumes from the persisted state and reads only the appended rows
+        assert len(IncrementalMetrics(tmp_path / "metrics").update_from_csv(csv)) == b - a
+    assert len(IncrementalMetrics(tmp_path / "metrics").update_from_csv(csv)) == 0
+
+    full = compute_metrics_pandas(pdf)
+    got = IncrementalMetrics(tmp_path / "metrics").read_all()
+    assert len(got) == len(full)
+    assert (got["symbol"].to_numpy() == full["symbol"].to_numpy()).all()
+    for col in ["ret","roll_ma_20","roll_std_20","roll_sharpe_20"]:
+        assert np.allclose(got[col].to_numpy(), full[col].to_numpy(), atol=1e-6, equal_nan=True)
@@ -1,4 +1,5 @@
-from data_loader import load_pandas, load_polars
+import pandas as pd
+from data_loader import load_pandas, load_polars, convert
 
 def test_ingestion_equivalence():
     pdf = load_pandas("market_data-1.csv")
@@ -8,3 +9,16 @@ def test_ingestion_equivalence():
     assert pdf["symbol"].nunique() == pld["symbol"].n_unique()
     assert pdf["timestamp"].min() == pld["timestamp"].min()
     assert pdf["timestamp"].max() == pld["timestamp"].max()
+
+def test_columnar_conversion_round_trips(tmp_path):
+    pdf = load_pandas("market_data-1.csv")
+    pld = load_polars("market_data-1.csv")
+    assert isinstance(pdf["symbol"].dtype, pd.CategoricalDtype)
+    for fmt in ("parquet", "feather"):
+        path = convert("market_data-1.csv", fmt, tmp_path / f"ticks.{fmt}")
+        assert convert("market_data-1.csv", fmt, path) == path  # up to date: not rewritten
+        assert load_polars(path).equals(pld)
+        got = load_pandas(path)
+        assert (got["symbol"].astype(str).to_numpy() == pdf["symbol"].astype(str).to_numpy()).all()
+        assert (got["timestamp"].to_numpy() == pdf["timestamp"].to_numpy()).all()
+        assert (got["price"].to_numpy() == pdf["price"].to_numpy()).all()
@@ -1,7 +1,7 @@
 import numpy as np
 import polars as pl
 from data_loader import load_pandas, load_polars
-from metrics import compute_metrics_pandas, compute_metrics_polars
+from metrics import compute_metrics_pandas, compute_metrics_polars, compute_metrics_polars_lazy, compute_metrics_numpy
 
 def test_rolling_equivalence():
     pdf = load_pandas("market_data-1.csv")
@@ -14,3 +14,22 @@ def test_rolling_equivalence():
         a = mp[col].astype(float).to_numpy()
         b = ml.get_column(col).cast(pl.Float64).to_numpy()
         assert np.allclose(a, b, atol=1e-6, equal_nan=True)
+
+def test_lazy_polars_matches_eager():
+    pld = load_polars("market_data-1.csv")
+    eager = compute_metrics_polars(pld).sort(["symbol","timestamp"])
+    for lazy in (compute_metrics_polars_lazy(pld), compute_metrics_polars_lazy("market_data-1.csv", streaming=True)):
+        lazy = lazy.sort(["symbol","timestamp"])
+        assert lazy.columns == eager.columns
+        for col in ["ret","roll_ma_20","roll_std_20","roll_sharpe_20"]:
+            a = eager.get_column(col).cast(pl.Float64).to_numpy()
+            b = lazy.get_column(col).cast(pl.Float64).to_numpy()
+            assert np.allclose(a, b, atol=1e-6, equal_nan=True)
+
+def test_numpy_kernel_matches_pandas():
+    pdf = load_pandas("market_data-1.csv").sample(frac=1, random_state=0)
+    mp = compute_metrics_pandas(pdf.copy())
+    mk = compute_metrics_numpy(pdf.copy())
+    assert (mp["symbol"].to_numpy() == mk["symbol"].to_numpy()).all()
+    for col in ["ret","roll_ma_20","roll_std_20","roll_sharpe_20"]:
+        assert np.allclose(mp[col].to_numpy(), mk[col].to_numpy(), atol=1e-6, equal_nan=True)
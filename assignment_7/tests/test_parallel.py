@@ -4,7 +4,7 @@ from data_loader import load_pandas, load_polars
 from metrics import compute_metrics_pandas, compute_metrics_polars
 from parallel import (
     parallel_pandas_thread, parallel_pandas_process,
-    parallel_polars_thread, parallel_polars_process,
+    parallel_polars_thread, parallel_polars_process, _lpt_batches,
 )
 
 def test_parallel_pandas_matches_sequential():
@@ -30,3 +30,11 @@ def test_parallel_polars_matches_sequential():
         c = pro.get_column(col).cast(pl.Float64).to_numpy()
         assert np.allclose(a, b, atol=1e-6, equal_nan=True)
         assert np.allclose(a, c, atol=1e-6, equal_nan=True)
+
+def test_lpt_batches_cover_rows_and_balance_skew():
+    sizes = np.array([1000, 10, 10, 10, 900, 10, 10, 50])
+    batches = _lpt_batches(sizes, 3)
+    rows = sorted(i for spans in batches for o, l in spans for i in range(o, o + l))
+    assert rows == list(range(int(sizes.sum())))
+    loads = sorted(sum(l for _, l in spans) for spans in batches)
+    assert loads == [100, 900, 1000]
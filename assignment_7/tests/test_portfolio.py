@@ -2,7 +2,7 @@ import json
 import math
 from data_loader import load_pandas
 from metrics import compute_metrics_pandas
-from portfolio import aggregate
+from portfolio import aggregate, compute_position
 
 def test_portfolio_aggregate_smoke():
     pdf = load_pandas("market_data-1.csv")
@@ -15,3 +15,12 @@ def test_portfolio_aggregate_smoke():
     assert "max_drawdown" in out
     assert isinstance(out["total_value"], (int, float))
     assert not math.isnan(out["total_value"])
+
+def test_aggregate_matches_per_position_scan():
+    mp = compute_metrics_pandas(load_pandas("market_data-1.csv"))
+    with open("portfolio_structure-1.json") as f:
+        port = json.load(f)
+    out = aggregate(port, mp)
+    for p in out["positions"] + out["sub_portfolios"][0]["positions"]:
+        v, s, d = compute_position(mp, p["symbol"], p["quantity"])
+        assert math.isclose(p["value"], v) and math.isclose(p["volatility"], s) and math.isclose(p["drawdown"], d)
@@ -0,0 +1,72 @@
+import socket
+import struct
+from typing import Iterator, Optional
+
+class FrameReader:
+    # Stream framing shared by the TCP consumers. Bytes are received straight into a preallocated
+    # bytearray (recv_into) and complete messages are handed out as memoryview slices of it, tracked
+    # by a read offset: nothing is copied per message, and leftover bytes are moved to the front only
+    # when the buffer fills up (it doubles if one message is larger than the whole buffer).
+    # A yielded view is only valid until the next recv()/feed(); copy it (bytes(view)) to keep it.
+    def __init__(self, sock: Optional[socket.socket] = None, size: int = 65536):
+        self.sock = sock
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.start = 0  # first unconsumed byte
+        self.end = 0    # end of received data
+
+    def _make_room(self):
+        if self.end < len(self.buf):
+            return
+        pending = self.end - self.start
+        if pending == len(self.buf):
+            buf = bytearray(2 * len(self.buf))
+            buf[:pending] = self.view[self.start:self.end]
+            self.buf, self.view = buf, memoryview(buf)
+        else:
+            self.buf[:pending] = self.buf[self.start:self.end]  # same length: no resize, so allowed while views are exported
+        self.start, self.end = 0, pending
+
+    def recv(self) -> int:
+        # one recv_into the free tail of the buffer; returns bytes read (0 = peer closed)
+        self._make_room()
+        n = self.sock.recv_into(self.view[self.end:])
+        self.end += n
+        return n
+
+    def feed(self, data) -> None:
+        # append bytes that did not come from self.sock (tests, benchmarks, replay)
+        data = memoryview(data)
+        while len(data):
+            self._make_room()
+            k = min(len(data), len(self.buf) - self.end)
+            self.view[self.end:self.end + k] = data[:k]
+            self.end += k
+            data = data[k:]
+
+    def delimited(self, delim: bytes = b"*") -> Iterator[memoryview]:
+        # complete messages terminated by `delim` (delimiter not included)
+        find = self.buf.find
+        while True:
+            idx = find(delim, self.start, self.end)
+            if idx < 0: break
+            msg = self.view[self.start:idx]
+            self.start = idx + len(delim)
+            yield msg
+        if self.start == self.end:
+            self.start = self.end = 0
+
+    def length_prefixed(self, hdr: struct.Struct) -> Iterator[memoryview]:
+        # complete frames of [hdr: payload length][payload]; yields the payloads
+        hsize = hdr.size
+        while self.end - self.start >= hsize:
+            n = hdr.unpack_from(self.buf, self.start)[0]
+            a = self.start + hsize
+            if self.end - a < n: break
+            self.start = a + n
+            yield self.view[a:a + n]
+        if self.start == self.end:
+            self.start = self.end = 0
+
+    def pending(self) -> int:
+        return self.end - self.start
@@ -1,12 +1,19 @@
 import socket
+import selectors
 import threading
 import time
 import random
-from typing import Dict, List
+from collections import deque
+from itertools import cycle, groupby, islice
+from typing import Callable, Dict, List, Optional
 import csv
 from pathlib import Path
+import numpy as np
+from protocol import encode_ticks
 
 MESSAGE_DELIM = b"*"
+_HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+_IOV_MAX = 512  # buffers per sendmsg call (POSIX guarantees at least 16, Linux allows 1024)
 
 # --- Metrics: one row per broadcasted price tick (for throughput) ---
 _METRICS_DIR = Path("metrics")
@@ -23,108 +30,270 @@ def _ensure_price_csv():
                 "bytes_sent_per_client"
             ])
 
-def _send_all(sock: socket.socket, payload: bytes):
-    total = 0
-    while total < len(payload):
-        sent = sock.send(payload[total:])
-        if sent == 0:
-            raise ConnectionError("socket connection broken")
-        total += sent
-    return total
+class _Client:
+    __slots__ = ("sock", "addr", "out", "pending", "partial", "events", "conflated")
+    def __init__(self, sock: socket.socket, addr):
+        self.sock, self.addr = sock, addr
+        self.out: deque = deque()  # queued messages; the head may be a partially sent memoryview
+        self.pending = 0           # bytes queued
+        self.partial = False       # head already partly on the wire (must be finished, never dropped)
+        self.events = selectors.EVENT_READ
+        self.conflated = 0         # messages dropped by conflation
 
-def run_price_server(host: str, port: int, symbols: List[str], tick_hz: float = 10.0):
-    _ensure_price_csv()
-
-    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    srv.bind((host, port))
-    srv.listen(5)
-    print(f"[Gateway:Prices] listening on {host}:{port}")
+class _FanOut:
+    # Non-blocking broadcast server driven by one selector from the tick loop's thread: accepts are
+    # handled as events (no accept thread), every subscriber has its own outbound queue, and a queue is
+    # flushed with one sendmsg (writev) per wakeup. A subscriber whose queue passes max_pending bytes is
+    # conflated: queued messages it has not started receiving are dropped and only the newest is kept
+    # (a price tick carries every symbol and only the latest sentiment matters, so latest wins). A slow
+    # or stalled reader therefore costs O(1) per tick and never delays the tick loop or other clients.
+    def __init__(self, host: str, port: int, name: str, max_pending: int = 1 << 16, verbose: bool = True):
+        self.name = name
+        self.verbose = verbose
+        self.max_pending = max_pending
+        self.sel = selectors.DefaultSelector()
+        self.srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.srv.bind((host, port))
+        self.srv.listen(128)
+        self.srv.setblocking(False)
+        self.port = self.srv.getsockname()[1]
+        self.sel.register(self.srv, selectors.EVENT_READ, None)
+        self.clients: Dict[socket.socket, _Client] = {}
+        if verbose:
+            print(f"[Gateway:{name}] listening on {host}:{self.port}")
 
-    prices: Dict[str, float] = {s: 100.0 + random.random()*10 for s in symbols}
-    clients: List[socket.socket] = []
-    srv.settimeout(1.0)
-
-    def accept_loop():
+    def _accept(self):
         while True:
             try:
-                c, addr = srv.accept()
-                c.setblocking(True)
-                clients.append(c)
-                print(f"[Gateway:Prices] client connected: {addr}")
-            except socket.timeout:
+                c, addr = self.srv.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            c.setblocking(False)
+            c.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            cl = _Client(c, addr)
+            self.clients[c] = cl
+            self.sel.register(c, cl.events, cl)  # readable = peer closed (subscribers never send)
+            if self.verbose:
+                print(f"[Gateway:{self.name}] client connected: {addr}")
+
+    def _drop(self, cl: _Client):
+        self.clients.pop(cl.sock, None)
+        try: self.sel.unregister(cl.sock)
+        except (KeyError, ValueError): pass
+        try: cl.sock.close()
+        except OSError: pass
+
+    def _flush(self, cl: _Client):
+        try:
+            if _HAS_SENDMSG:
+                sent = cl.sock.sendmsg(list(islice(cl.out, _IOV_MAX)))
+            else:
+                sent = cl.sock.send(b"".join(islice(cl.out, _IOV_MAX)))
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            self._drop(cl)
+            return
+        cl.pending -= sent
+        while sent:
+            head = cl.out[0]
+            if sent >= len(head):
+                sent -= len(head)
+                cl.out.popleft()
+                cl.partial = False
+            else:
+                cl.out[0] = memoryview(head)[sent:]
+                cl.partial = True
+                sent = 0
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if cl.out else 0)
+        if events != cl.events:
+            cl.events = events
+            self.sel.modify(cl.sock, events, cl)
+
+    def broadcast(self, msg: bytes) -> int:
+        # queue msg for every subscriber and write it out now wherever the socket has room;
+        # returns the number of subscribers it was queued for
+        clients = list(self.clients.values())
+        for cl in clients:
+            if cl.pending >= self.max_pending:
+                keep = cl.out[0] if cl.partial else None
+                cl.conflated += len(cl.out) - (keep is not None)
+                cl.out.clear()
+                cl.pending = 0
+                if keep is not None:
+                    cl.out.append(keep)
+                    cl.pending = len(keep)
+            cl.out.append(msg)
+            cl.pending += len(msg)
+            if not cl.events & selectors.EVENT_WRITE:  # already waiting for room: the selector will flush
+                self._flush(cl)
+        return len(clients)
+
+    def poll(self, timeout: float):
+        # wait up to timeout for accepts, disconnects and writable sockets
+        for key, mask in self.sel.select(timeout):
+            cl = key.data
+            if cl is None:
+                self._accept()
                 continue
+            if mask & selectors.EVENT_READ:
+                try:
+                    if not cl.sock.recv(4096):
+                        self._drop(cl); continue
+                except (BlockingIOError, InterruptedError):
+                    pass
+                except OSError:
+                    self._drop(cl); continue
+            if mask & selectors.EVENT_WRITE and cl.sock in self.clients:
+                self._flush(cl)
 
-    threading.Thread(target=accept_loop, daemon=True).start()
+    def close(self):
+        for cl in list(self.clients.values()):
+            self._drop(cl)
+        self.sel.close()
+        self.srv.close()
 
-    dt = 1.0 / tick_hz
-    while True:
-        for s in symbols:
-            prices[s] = max(0.01, prices[s] + random.gauss(0, 0.1))
+def _serve(fan: _FanOut, tick_hz: float, make_msg: Callable[[int], bytes], on_tick=None,
+           policy: str = "skip", max_ticks: Optional[int] = None):
+    # Deadline pacing: tick k is due at t0 + k/tick_hz, so the loop's own work does not drag the rate
+    # below target. Between ticks the selector services accepts, disconnects and slow-client flushes;
+    # it sleeps until ~1 ms before the deadline (epoll timeouts are whole milliseconds) and the rest
+    # is spun with zero-timeout polls. A tick due more than one period ago is handled per `policy`:
+    # "catch_up" fires the missed ticks back-to-back, "skip" drops them and rejoins the schedule.
+    # tick_hz <= 0 is burst mode: no pacing, ticks go out as fast as the loop runs.
+    # Runs forever unless max_ticks is given; returns (ticks sent, ticks skipped).
+    if policy not in ("skip", "catch_up"):
+        raise ValueError(f"unknown pacing policy: {policy!r}")
+    dt = 1.0 / tick_hz if tick_hz > 0 else 0.0
+    next_t = time.perf_counter()
+    n = skipped = 0
+    while max_ticks is None or n < max_ticks:
+        fan.poll(0)
+        while True:
+            wait = next_t - time.perf_counter()
+            if wait <= 0:
+                break
+            fan.poll(wait - 0.001 if wait > 0.002 else 0)
         now_ms = int(time.time() * 1000)
-        msg = MESSAGE_DELIM.join(
-            [f"{s},{prices[s]:.5f},{now_ms}".encode("utf-8") for s in symbols]
+        msg = make_msg(now_ms)
+        clients = fan.broadcast(msg)
+        if on_tick is not None:
+            on_tick(now_ms, msg, clients)
+        n += 1
+        next_t += dt
+        behind = time.perf_counter() - next_t
+        if policy == "skip" and dt and behind >= dt:
+            missed = int(behind // dt)
+            next_t += missed * dt
+            skipped += missed
+    return n, skipped
+
+def load_recording(path, symbols: List[str]) -> np.ndarray:
+    # Recorded ticks for replay, from a timestamp,symbol,price CSV (the market-data layout used in
+    # assignment_7). Returns one row of prices per distinct timestamp, in `symbols` order: a symbol
+    # keeps its last price until it trades again and its first recorded price before that, so every
+    # replayed tick is a full snapshot like a live one. Rows for other symbols are ignored.
+    idx = {s: i for i, s in enumerate(symbols)}
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            i = idx.get(r["symbol"])
+            if i is not None:
+                rows.append((_ts_key(r["timestamp"]), i, float(r["price"])))
+    rows.sort(key=lambda r: r[0])
+    first: Dict[int, float] = {}
+    for _, i, p in rows:
+        first.setdefault(i, p)
+    missing = [s for i, s in enumerate(symbols) if i not in first]
+    if missing:
+        raise ValueError(f"no recorded prices for {missing} in {path}")
+    cur = [first[i] for i in range(len(symbols))]
+    snaps = []
+    for _, group in groupby(rows, key=lambda r: r[0]):
+        for _, i, p in group:
+            cur[i] = p
+        snaps.append(list(cur))
+    return np.asarray(snaps, dtype=np.float64)
+
+def _ts_key(ts: str):
+    # epoch numbers sort numerically, ISO-8601 strings sort as text
+    try:
+        return float(ts)
+    except ValueError:
+        return ts
+
+def run_price_server(host: str, port: int, symbols: List[str], tick_hz: float = 10.0, binary: bool = False,
+                     replay: Optional[str] = None, policy: str = "skip"):
+    # binary=True sends one length-prefixed frame of packed records per tick (see protocol.py).
+    # replay=path sends recorded prices (load_recording, looped and stamped with the current time)
+    # instead of the random walk; with tick_hz <= 0 they are pumped as fast as possible.
+    _ensure_price_csv()
+    fan = _FanOut(host, port, "Prices")
+
+    if replay:
+        frames = cycle(load_recording(replay, symbols).tolist())
+        next_prices = lambda: next(frames)
+        print(f"[Gateway:Prices] replaying {replay}")
+    else:
+        walk = [100.0 + random.random()*10 for _ in symbols]
+        def next_prices() -> List[float]:
+            for i, p in enumerate(walk):
+                walk[i] = max(0.01, p + random.gauss(0, 0.1))
+            return walk
+
+    def make_msg(now_ms: int) -> bytes:
+        prices = next_prices()
+        if binary:
+            return encode_ticks(prices, now_ms)
+        return MESSAGE_DELIM.join(
+            [f"{s},{p:.5f},{now_ms}".encode("utf-8") for s, p in zip(symbols, prices)]
         ) + MESSAGE_DELIM
 
-        dead = []
-        bytes_per_client = 0
-        for i, c in enumerate(clients):
-            try:
-                bytes_per_client = _send_all(c, msg)
-            except Exception:
-                dead.append(i)
-        for i in reversed(dead):
-            try: clients[i].close()
-            except Exception: pass
-            clients.pop(i)
-
-        # Write one row (tick happens regardless of number of clients)
-        with _PRICE_TICKS_CSV.open("a", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow([now_ms, len(symbols), bytes_per_client])
+    # One row per tick (tick happens regardless of number of clients). The file stays open and is
+    # flushed every ~0.5 s: reopening it per tick would cap the tick rate.
+    with _PRICE_TICKS_CSV.open("a", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        last_flush = [0]
 
-        time.sleep(dt)
+        def on_tick(now_ms: int, msg: bytes, n_clients: int):
+            w.writerow([now_ms, len(symbols), len(msg) if n_clients else 0])
+            if now_ms - last_flush[0] >= 500:
+                f.flush()
+                last_flush[0] = now_ms
 
-def run_news_server(host: str, port: int, tick_hz: float = 2.0):
-    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    srv.bind((host, port))
-    srv.listen(5)
-    print(f"[Gateway:News] listening on {host}:{port}")
-    clients: List[socket.socket] = []
-    srv.settimeout(1.0)
-
-    def accept_loop():
-        while True:
-            try:
-                c, addr = srv.accept()
-                clients.append(c)
-                print(f"[Gateway:News] client connected: {addr}")
-            except socket.timeout:
-                continue
+        _serve(fan, tick_hz, make_msg, on_tick, policy)
 
-    threading.Thread(target=accept_loop, daemon=True).start()
+def run_news_server(host: str, port: int, tick_hz: float = 2.0):
+    fan = _FanOut(host, port, "News")
 
-    dt = 1.0 / tick_hz
-    while True:
+    def make_msg(now_ms: int) -> bytes:
         sentiment = random.randint(0, 100)
-        now_ms = int(time.time() * 1000)
-        payload = f"{sentiment},{now_ms}".encode("utf-8") + MESSAGE_DELIM
-        dead = []
-        for i, c in enumerate(clients):
-            try:
-                _send_all(c, payload)
-            except Exception:
-                dead.append(i)
-        for i in reversed(dead):
-            try: clients[i].close()
-            except Exception: pass
-            clients.pop(i)
-        time.sleep(dt)
-
-def run_gateway(host: str, price_port: int, news_port: int, symbols: List[str]):
-    t1 = threading.Thread(target=run_price_server, args=(host, price_port, symbols), daemon=True)
+        return f"{sentiment},{now_ms}".encode("utf-8") + MESSAGE_DELIM
+
+    _serve(fan, tick_hz, make_msg)
+
+def run_gateway(host: str, price_port: int, news_port: int, symbols: List[str], binary: bool = False,
+                tick_hz: float = 10.0, replay: Optional[str] = None, policy: str = "skip"):
+    # tick_hz/replay/policy configure the price feed (see run_price_server and _serve)
+    t1 = threading.Thread(target=run_price_server, args=(host, price_port, symbols),
+                          kwargs={"binary": binary, "tick_hz": tick_hz, "replay": replay, "policy": policy}, daemon=True)
     t2 = threading.Thread(target=run_news_server, args=(host, news_port), daemon=True)
     t1.start(); t2.start()
     print("[Gateway] running. Press Ctrl+C to stop.")
     t1.join(); t2.join()
+
+if __name__ == "__main__":
+    # standalone load generator for stress-testing the downstream processes, e.g.
+    #   python gateway.py --hz 20000                       # paced high-rate synthetic feed
+    #   python gateway.py --replay ticks.csv --hz 0        # recorded ticks as fast as possible
+    import argparse
+    from main import HOST, PRICE_PORT, NEWS_PORT, SYMBOLS, BINARY_WIRE
+    ap = argparse.ArgumentParser(description="Run the price/news gateway on its own")
+    ap.add_argument("--hz", type=float, default=10.0, help="price ticks per second (<= 0: burst, no pacing)")
+    ap.add_argument("--policy", choices=["skip", "catch_up"], default="skip", help="what to do with missed tick deadlines")
+    ap.add_argument("--replay", help="timestamp,symbol,price CSV to replay instead of the random walk")
+    ap.add_argument("--binary", action="store_true", default=BINARY_WIRE, help="binary price frames (protocol.py)")
+    ap.add_argument("--symbols", nargs="+", default=SYMBOLS)
+    a = ap.parse_args()
+    run_gateway(HOST, PRICE_PORT, NEWS_PORT, a.symbols, a.binary, a.hz, a.replay, a.policy)
@@ -12,6 +12,8 @@ NEWS_PORT = 50052
 OM_PORT = 50053
 
 SYMBOLS = ["AAPL", "MSFT", "GOOG"]
+BINARY_WIRE = False  # packed binary price frames instead of "sym,price,ts*" text (protocol.py)
+TICK_HZ = 10.0       # gateway price ticks per second (deadline-paced; <= 0 pumps as fast as possible)
 
 def main():
     lock = Lock()
@@ -21,8 +23,8 @@ def main():
     print(f"[Main] Shared memory created: name={shm_name}, symbols={SYMBOLS}")
 
     procs = [
-        Process(target=run_gateway, args=(HOST, PRICE_PORT, NEWS_PORT, SYMBOLS), daemon=True),
-        Process(target=run_orderbook, args=(HOST, PRICE_PORT, shm_name, SYMBOLS, lock), daemon=True),
+        Process(target=run_gateway, args=(HOST, PRICE_PORT, NEWS_PORT, SYMBOLS, BINARY_WIRE, TICK_HZ), daemon=True),
+        Process(target=run_orderbook, args=(HOST, PRICE_PORT, shm_name, SYMBOLS, lock, BINARY_WIRE), daemon=True),
         Process(target=run_strategy, args=(shm_name, SYMBOLS, lock, HOST, NEWS_PORT, HOST, OM_PORT), daemon=True),
         Process(target=run_order_manager, args=(HOST, OM_PORT), daemon=True),
     ]
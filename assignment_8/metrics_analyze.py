@@ -1,10 +1,12 @@
 """
 Usage:
-    python metrics_analyze.py
+    python metrics_analyze.py            # analyze recorded metrics
+    python metrics_analyze.py --bench    # also run the codec, framing, fan-out and tick-pacing micro-benchmarks
 
 Reads:
   metrics/orders_log.csv
   metrics/price_ticks.csv
+  metrics/orderbook_ticks.csv   (consumer-side decode throughput, per wire mode)
 Outputs:
   metrics/performance_report_generated.md
 Prints key stats to stdout as well.
@@ -12,11 +14,15 @@ Prints key stats to stdout as well.
 from pathlib import Path
 import csv
 import statistics
+import socket
+import sys
+import time
 from datetime import datetime
 
 METRICS_DIR = Path("metrics")
 ORDERS = METRICS_DIR / "orders_log.csv"
 TICKS  = METRICS_DIR / "price_ticks.csv"
+BOOK   = METRICS_DIR / "orderbook_ticks.csv"
 OUT_MD = METRICS_DIR / "performance_report.md"
 
 def _read_latencies():
@@ -42,24 +48,202 @@ def _read_latencies():
     return l_price, l_strat
 
 def _read_throughput():
-    # Simple throughput: ticks per second over the observed window
+    # Simple throughput: gateway ticks per second over the observed window, plus symbol updates
+    # per second (each gateway tick carries symbols_count prices)
     if not TICKS.exists():
-        return None, None, 0, 0.0
+        return None, None, 0, 0.0, 0.0
     ts = []
+    n_updates = 0
     with TICKS.open("r", encoding="utf-8") as f:
         r = csv.DictReader(f)
         for row in r:
             try:
                 ts.append(int(row["tick_ts_ms"]))
+                n_updates += int(row.get("symbols_count") or 0)
             except Exception:
                 pass
     if not ts:
-        return None, None, 0, 0.0
+        return None, None, 0, 0.0, 0.0
     ts.sort()
     start_ms, end_ms = ts[0], ts[-1]
     duration_sec = max(1e-9, (end_ms - start_ms) / 1000.0)
     tps = len(ts) / duration_sec
-    return start_ms, end_ms, len(ts), tps
+    return start_ms, end_ms, len(ts), tps, n_updates / duration_sec
+
+def _read_consumer_throughput():
+    # orderbook decode rate per wire mode: {wire: (ticks, seconds, ticks/sec, bytes/sec)}
+    out = {}
+    if not BOOK.exists():
+        return out
+    acc = {}
+    with BOOK.open("r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                a = acc.setdefault(row["wire"], [0, 0, 0.0])
+                a[0] += int(row["ticks"]); a[1] += int(row["bytes"]); a[2] += float(row["window_s"])
+            except Exception:
+                pass
+    for wire, (n, b, secs) in acc.items():
+        if secs > 0:
+            out[wire] = (n, secs, n / secs, b / secs)
+    return out
+
+def _bench_codecs(n_frames=20_000, universes=(3, 100)):
+    # ticks/sec the orderbook's own drain loops sustain per wire mode, fed 4 KB chunks like recv()
+    # and updating a real (lock-protected) SharedPriceBook, without sockets in the way
+    from multiprocessing import Lock
+    from protocol import encode_ticks
+    from framing import FrameReader
+    from orderbook import _drain_binary, _drain_text
+    from shared_memory_utils import SharedPriceBook
+    out = {}
+    now_ms = int(time.time() * 1000)
+    for n_symbols in universes:
+        syms = [f"S{i}" for i in range(n_symbols)]
+        prices = [100.0 + i for i in range(n_symbols)]
+        frames = max(1, n_frames * 3 // n_symbols)
+        streams = {
+            "text": (b"*".join(f"{s},{p:.5f},{now_ms}".encode("utf-8") for s, p in zip(syms, prices)) + b"*") * frames,
+            "binary": encode_ticks(prices, now_ms) * frames,
+        }
+        book = SharedPriceBook(syms, create=True)
+        book.attach_lock(Lock())
+        try:
+            for wire, data in streams.items():
+                drain = _drain_binary if wire == "binary" else _drain_text
+                t0 = time.perf_counter()
+                reader, n = FrameReader(), 0
+                for i in range(0, len(data), 4096):
+                    reader.feed(data[i:i + 4096])
+                    n += drain(reader, book)
+                secs = time.perf_counter() - t0
+                out[f"{wire}, {n_symbols} symbols/tick"] = (n, secs, n / secs, len(data) / n)
+        finally:
+            book.close(); book.unlink()
+    return out
+
+def _send_stream(port, msg, n_msgs, rate, batch=100):
+    # benchmark sender (separate process): n_msgs copies of msg in sendall batches of `batch`,
+    # paced to `rate` msgs/sec on absolute deadlines (rate=0: as fast as possible)
+    s = socket.create_connection(("127.0.0.1", port))
+    blob = msg * batch
+    t0 = time.perf_counter()
+    for i in range(n_msgs // batch):
+        if rate:
+            wait = t0 + i * batch / rate - time.perf_counter()
+            if wait > 0.001: time.sleep(wait)
+            while time.perf_counter() < t0 + i * batch / rate: pass
+        s.sendall(blob)
+    s.close()
+
+def _legacy_count(conn, delim=b"*"):
+    # the consumers' previous loop: recv(4096), bytes concatenation, slice per message
+    buf, n = b"", 0
+    while True:
+        data = conn.recv(4096)
+        if not data: return n
+        buf += data
+        while True:
+            idx = buf.find(delim)
+            if idx < 0: break
+            _msg = buf[:idx]; buf = buf[idx+1:]; n += 1
+
+def _reader_count(conn, delim=b"*"):
+    from framing import FrameReader
+    reader, n = FrameReader(conn), 0
+    while reader.recv():
+        for _msg in reader.delimited(delim):
+            n += 1
+    return n
+
+def _bench_framing(rate=100_000, seconds=1.0, burst=1_000_000):
+    # receive-side framing cost over a real local TCP socket: a paced run at `rate` msgs/sec (does the
+    # consumer keep up, and at what CPU cost) and an unpaced burst (max msgs/sec)
+    from multiprocessing import Process
+    msg = b"AAPL,101.12345,1700000000000*"
+    out = {}
+    for label, n_msgs, r in ((f"paced {rate:,}/s", int(rate * seconds), rate), ("burst", burst, 0)):
+        for impl, count in (("bytes concat", _legacy_count), ("FrameReader", _reader_count)):
+            srv = socket.socket(); srv.bind(("127.0.0.1", 0)); srv.listen(1)
+            p = Process(target=_send_stream, args=(srv.getsockname()[1], msg, n_msgs, r), daemon=True)
+            p.start()
+            conn, _ = srv.accept()
+            t0, c0 = time.perf_counter(), time.thread_time()
+            n = count(conn)
+            wall, cpu = time.perf_counter() - t0, time.thread_time() - c0
+            conn.close(); srv.close(); p.join()
+            out[f"{label}, {impl}"] = (n, wall, n / wall, cpu / max(n, 1) * 1e6, cpu / wall)
+    return out
+
+def _bench_fanout(subscribers=(10, 100, 300), ticks=2000, n_symbols=100):
+    # gateway fan-out cost per tick as local subscribers scale; one subscriber never reads, so its
+    # socket fills up and it is conflated instead of stalling the broadcast
+    from gateway import _FanOut
+    msg = b"".join(f"S{i:03d},{100 + i:.5f},1700000000000*".encode() for i in range(n_symbols))
+    out = {}
+    for n in subscribers:
+        fan = _FanOut("127.0.0.1", 0, "Bench", verbose=False)
+        subs = []
+        for i in range(n):  # accept as we go so the listen backlog never fills
+            c = socket.socket()
+            if i == 0:  # the stalled reader: small receive window so its backlog reaches the gateway quickly
+                c.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            c.connect(("127.0.0.1", fan.port))
+            subs.append(c)
+            fan.poll(0)
+        while len(fan.clients) < n:
+            fan.poll(0.01)
+        for c in subs:
+            c.setblocking(False)
+        got = [0] * n
+        times = []
+        for _ in range(ticks):
+            t0 = time.perf_counter()
+            fan.broadcast(msg)
+            times.append(time.perf_counter() - t0)
+            fan.poll(0)
+            for i in range(1, n):  # subs[0] is the stalled reader
+                try:
+                    while True:
+                        k = len(subs[i].recv(1 << 16))
+                        if not k: break
+                        got[i] += k
+                except BlockingIOError:
+                    pass
+        conflated = sorted(cl.conflated for cl in fan.clients.values())
+        complete = sum(g == ticks * len(msg) for g in got[1:])
+        for c in subs: c.close()
+        fan.close()
+        med = statistics.median(times)
+        out[n] = (med * 1e6, _p95(times) * 1e6, med * 1e6 / n, complete, n - 1, conflated[-1])
+    return out
+
+def _bench_pacing(rates=(10, 1_000, 20_000), seconds=2.0):
+    # achieved tick rate and interval jitter of the gateway loop with no subscribers: the previous
+    # "work, then sleep(1/hz)" loop against the deadline scheduler (gateway._serve), plus burst mode
+    from gateway import _FanOut, _serve
+    msg_for = lambda now_ms: b"".join(f"{s},{100.5:.5f},{now_ms}*".encode() for s in ("AAPL","MSFT","GOOG"))
+    fan = _FanOut("127.0.0.1", 0, "Bench", verbose=False)
+    out = {}
+    for hz in list(rates) + [0]:
+        n = max(int(hz * seconds), 10) if hz else 200_000
+        runs = (("sleep", "deadline") if hz else ("deadline",))
+        for mode in runs:
+            stamps = []
+            on_tick = lambda now_ms, msg, k: stamps.append(time.perf_counter())
+            if mode == "deadline":
+                _serve(fan, hz, msg_for, on_tick, max_ticks=n)
+            else:
+                for _ in range(n):
+                    msg = msg_for(int(time.time() * 1000))
+                    on_tick(0, msg, fan.broadcast(msg))
+                    time.sleep(1.0 / hz)
+            gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+            rate = len(gaps) / (stamps[-1] - stamps[0])
+            jitter = _p95([abs(g - 1.0 / hz) for g in gaps]) * 1e6 if hz else float("nan")
+            out[f"{hz} Hz, {mode}" if hz else "burst"] = (rate, jitter)
+    fan.close()
+    return out
 
 def _p95(xs):
     if not xs:
@@ -70,7 +254,12 @@ def _p95(xs):
 
 def main():
     l_price, l_strat = _read_latencies()
-    s_ms, e_ms, n_ticks, tps = _read_throughput()
+    s_ms, e_ms, n_ticks, tps, ups = _read_throughput()
+    consumer = _read_consumer_throughput()
+    bench = _bench_codecs() if "--bench" in sys.argv[1:] else None
+    framing = _bench_framing() if "--bench" in sys.argv[1:] else None
+    fanout = _bench_fanout() if "--bench" in sys.argv[1:] else None
+    pacing = _bench_pacing() if "--bench" in sys.argv[1:] else None
 
     def _fmt_stats(arr):
         if not arr:
@@ -83,7 +272,19 @@ def main():
     print("Latency (price tick → order received):", _fmt_stats(l_price))
     print("Latency (strategy send → order received):", _fmt_stats(l_strat))
     if s_ms is not None:
-        print(f"Throughput: ticks={n_ticks}, window={(e_ms - s_ms)/1000.0:.2f}s, ticks/sec={tps:.2f}")
+        print(f"Throughput: ticks={n_ticks}, window={(e_ms - s_ms)/1000.0:.2f}s, ticks/sec={tps:.2f}, symbol updates/sec={ups:.2f}")
+    for wire, (n, secs, rate, bps) in consumer.items():
+        print(f"OrderBook decode ({wire}): ticks={n}, window={secs:.2f}s, ticks/sec={rate:.2f}, bytes/sec={bps:.0f}")
+    if bench:
+        for wire, (n, secs, rate, bpt) in bench.items():
+            print(f"Codec bench ({wire}): {n} ticks in {secs:.3f}s -> {rate:,.0f} ticks/sec, {bpt:.1f} bytes/tick")
+        for k, (n, secs, rate, us, util) in framing.items():
+            print(f"Framing bench ({k}): {n} msgs in {secs:.3f}s -> {rate:,.0f} msgs/sec, {us:.2f} us CPU/msg, receiver CPU {util:.0%}")
+        for n, (med, p95, per, ok, live, dropped) in fanout.items():
+            print(f"Fan-out bench ({n} subscribers): {med:.0f} us/tick median, p95 {p95:.0f} us, {per:.2f} us/subscriber, "
+                  f"{ok}/{live} live subscribers got every tick, stalled one conflated {dropped} ticks")
+        for k, (rate, jitter) in pacing.items():
+            print(f"Pacing bench ({k}): {rate:,.0f} ticks/sec achieved, p95 interval error {jitter:.0f} us")
 
     # Write markdown
     OUT_MD.parent.mkdir(exist_ok=True)
@@ -101,6 +302,23 @@ def main():
             f.write(f"- Ticks observed: {n_ticks}\n")
             f.write(f"- Observation window: {dur:.2f} s\n")
             f.write(f"- Approx ticks/sec: {tps:.2f}\n")
+            f.write(f"- Approx symbol updates/sec: {ups:.2f}\n")
+        for wire, (n, secs, rate, bps) in consumer.items():
+            f.write(f"- OrderBook decode ({wire}): {n} ticks over {secs:.2f} s, {rate:.2f} ticks/sec, {bps:.0f} bytes/sec\n")
+        if bench:
+            f.write("\n## Wire codec micro-benchmark\n")
+            for wire, (n, secs, rate, bpt) in bench.items():
+                f.write(f"- {wire}: {rate:,.0f} ticks/sec decoded ({n} ticks, {bpt:.1f} bytes/tick)\n")
+            f.write("\n## Stream framing micro-benchmark (local TCP)\n")
+            for k, (n, secs, rate, us, util) in framing.items():
+                f.write(f"- {k}: {rate:,.0f} msgs/sec, {us:.2f} us CPU/msg, receiver CPU {util:.0%}\n")
+            f.write("\n## Gateway fan-out micro-benchmark (one stalled subscriber)\n")
+            for n, (med, p95, per, ok, live, dropped) in fanout.items():
+                f.write(f"- {n} subscribers: {med:.0f} us/tick median (p95 {p95:.0f} us, {per:.2f} us/subscriber), "
+                        f"{ok}/{live} live complete, stalled conflated {dropped} ticks\n")
+            f.write("\n## Gateway tick pacing micro-benchmark (no subscribers)\n")
+            for k, (rate, jitter) in pacing.items():
+                f.write(f"- {k}: {rate:,.0f} ticks/sec achieved, p95 interval error {jitter:.0f} us\n")
 
 if __name__ == "__main__":
     main()
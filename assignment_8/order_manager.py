@@ -4,6 +4,7 @@ import json
 import time
 import csv
 from pathlib import Path
+from framing import FrameReader
 
 MESSAGE_DELIM = b"*"
 
@@ -67,23 +68,16 @@ def run_order_manager(host: str, port: int):
 
     def handle_client(c: socket.socket, addr):
         print(f"[OrderManager] client {addr} connected")
-        buf = b""
+        reader = FrameReader(c)
         try:
             while True:
-                data = c.recv(4096)
-                if not data:
+                if not reader.recv():
                     break
-                buf += data
-                while True:
-                    idx = buf.find(MESSAGE_DELIM)
-                    if idx < 0:
-                        break
-                    payload = buf[:idx]
-                    buf = buf[idx+1:]
+                for payload in reader.delimited(MESSAGE_DELIM):
                     if not payload:
                         continue
                     try:
-                        order = json.loads(payload.decode("utf-8"))
+                        order = json.loads(str(payload, "utf-8"))
                         recv_ms = int(time.time() * 1000)
                         _append_order_row(order, recv_ms)
 
@@ -1,9 +1,38 @@
 import socket
 import time
+import csv
+from pathlib import Path
 from typing import List
 from shared_memory_utils import SharedPriceBook
+from protocol import FRAME_HDR, TICK, decode_ticks
+from framing import FrameReader
 
 MESSAGE_DELIM = b"*"
+# frames with fewer records than this are unpacked with struct (numpy's per-call overhead dominates)
+_NUMPY_MIN_RECORDS = 32
+
+# --- Metrics: one row per second of consumer-side decode throughput ---
+_METRICS_DIR = Path("metrics")
+_METRICS_DIR.mkdir(exist_ok=True)
+_BOOK_STATS_CSV = _METRICS_DIR / "orderbook_ticks.csv"
+
+class _Throughput:
+    # counts decoded ticks/bytes and appends a row to orderbook_ticks.csv once per second
+    def __init__(self, wire: str):
+        self.wire = wire
+        self.ticks = self.bytes = 0
+        self.t0 = time.time()
+        if not _BOOK_STATS_CSV.exists():
+            with _BOOK_STATS_CSV.open("w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerow(["ts_ms", "wire", "ticks", "bytes", "window_s"])
+
+    def add(self, ticks: int, nbytes: int):
+        self.ticks += ticks; self.bytes += nbytes
+        now = time.time()
+        if now - self.t0 >= 1.0:
+            with _BOOK_STATS_CSV.open("a", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerow([int(now * 1000), self.wire, self.ticks, self.bytes, round(now - self.t0, 4)])
+            self.ticks = self.bytes = 0; self.t0 = now
 
 def _connect(host: str, port: int) -> socket.socket:
     while True:
@@ -17,31 +46,49 @@ def _connect(host: str, port: int) -> socket.socket:
             print(f"[OrderBook] connect failed, retrying in 1s: {e}")
             time.sleep(1)
 
-def run_orderbook(host: str, price_port: int, shm_name: str, symbols: List[str], lock):
+def _drain_text(reader: FrameReader, book: SharedPriceBook) -> int:
+    # apply every complete "sym,price,ts*" message buffered in reader; returns ticks applied
+    ticks = 0
+    for msg in reader.delimited(MESSAGE_DELIM):
+        parts = str(msg, "utf-8").split(",")
+        if len(parts) != 3: continue
+        sym, price_str, _ts = parts
+        try: price = float(price_str)
+        except ValueError: continue
+        book.update(sym, price)
+        ticks += 1
+    return ticks
+
+def _drain_binary(reader: FrameReader, book: SharedPriceBook) -> int:
+    # apply every complete length-prefixed frame (one book update, one lock, per frame)
+    ticks = 0
+    for payload in reader.length_prefixed(FRAME_HDR):
+        if len(payload) < _NUMPY_MIN_RECORDS * TICK.size:
+            book.update_records(TICK.iter_unpack(payload))
+        else:
+            rec = decode_ticks(payload)
+            book.update_many(rec["sym"], rec["price"])
+        ticks += len(payload) // TICK.size
+    return ticks
+
+def run_orderbook(host: str, price_port: int, shm_name: str, symbols: List[str], lock, binary: bool = False):
+    # binary must match the gateway's framing (see protocol.py)
     book = SharedPriceBook(symbols, name=shm_name, create=False)
     book.attach_lock(lock)
+    stats = _Throughput("binary" if binary else "text")
+    drain = _drain_binary if binary else _drain_text
 
     s = _connect(host, price_port)
-    buf = b""
+    reader = FrameReader(s)
     while True:
         try:
-            chunk = s.recv(4096)
-            if not chunk: raise ConnectionError("gateway closed")
-            buf += chunk
-            while True:
-                idx = buf.find(MESSAGE_DELIM)
-                if idx < 0: break
-                message = buf[:idx].decode("utf-8")
-                buf = buf[idx+1:]
-                parts = message.split(",")
-                if len(parts) != 3: continue
-                sym, price_str, _ts = parts
-                try: price = float(price_str)
-                except ValueError: continue
-                book.update(sym, price)
+            n = reader.recv()
+            if not n: raise ConnectionError("gateway closed")
+            stats.add(drain(reader, book), n)
         except Exception as e:
             print(f"[OrderBook] error: {e}, reconnecting...")
             try: s.close()
             except Exception: pass
             time.sleep(1.0)
             s = _connect(host, price_port)
+            reader = FrameReader(s)
@@ -0,0 +1,24 @@
+import struct
+from typing import Sequence
+import numpy as np
+
+# Binary price feed (opt-in; the text feed "sym,price,ts*" stays the default).
+# One frame per gateway tick:  [u32 payload length][payload]
+# payload = N packed little-endian records: u32 symbol id, f64 price, i64 ts_ms  (20 bytes each)
+# The symbol id is the symbol's index in the shared SYMBOLS list, i.e. its SharedPriceBook slot.
+FRAME_HDR = struct.Struct("<I")
+TICK = struct.Struct("<Idq")
+TICK_DTYPE = np.dtype([("sym", "<u4"), ("price", "<f8"), ("ts", "<i8")])
+assert TICK_DTYPE.itemsize == TICK.size
+
+def encode_ticks(prices: Sequence[float], ts_ms: int) -> bytes:
+    # one frame holding every symbol's price, ids 0..N-1 in list order
+    rec = np.empty(len(prices), dtype=TICK_DTYPE)
+    rec["sym"] = np.arange(len(prices))
+    rec["price"] = prices
+    rec["ts"] = ts_ms
+    return FRAME_HDR.pack(rec.nbytes) + rec.tobytes()
+
+def decode_ticks(payload) -> np.ndarray:
+    # zero-copy view of a frame payload as records (fields: sym, price, ts)
+    return np.frombuffer(payload, dtype=TICK_DTYPE, count=len(payload) // TICK.size)
@@ -43,6 +43,27 @@ class SharedPriceBook:
             return
         self.arr[i] = float(price)
 
+    def update_many(self, ids, prices) -> None:
+        # vectorized update by slot index (binary feed); one lock acquisition per batch
+        ids = np.asarray(ids)
+        ok = ids < len(self.symbols)
+        if self.lock is not None:
+            with self.lock:
+                self.arr[ids[ok]] = np.asarray(prices)[ok]
+        else:
+            self.arr[ids[ok]] = np.asarray(prices)[ok]
+
+    def update_records(self, records) -> None:
+        # (slot, price, ...) tuples, e.g. struct.iter_unpack output; cheaper than numpy for a few records
+        arr, n = self.arr, len(self.symbols)
+        if self.lock is not None:
+            with self.lock:
+                for r in records:
+                    if r[0] < n: arr[r[0]] = r[1]
+        else:
+            for r in records:
+                if r[0] < n: arr[r[0]] = r[1]
+
     def read(self, symbol: str) -> float:
         i = self.index.get(symbol)
         if i is None:
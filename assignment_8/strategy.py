@@ -2,6 +2,7 @@ import socket, time, json, math
 from collections import deque
 from typing import Dict, List, Optional
 from shared_memory_utils import SharedPriceBook
+from framing import FrameReader
 
 MESSAGE_DELIM = b"*"
 
@@ -18,15 +19,11 @@ def _connect(host: str, port: int) -> socket.socket:
             time.sleep(1)
 
 def _recv_delimited(sock: socket.socket):
-    buf = b""
+    # yields each message as a memoryview into the reader's buffer, valid until the next message
+    reader = FrameReader(sock)
     while True:
-        data = sock.recv(4096)
-        if not data: raise ConnectionError("server closed")
-        buf += data
-        while True:
-            idx = buf.find(MESSAGE_DELIM)
-            if idx < 0: break
-            msg = buf[:idx]; buf = buf[idx+1:]; yield msg
+        if not reader.recv(): raise ConnectionError("server closed")
+        yield from reader.delimited(MESSAGE_DELIM)
 
 def run_strategy(
     shm_name: str,
@@ -64,7 +61,7 @@ def run_strategy(
     last_poll, poll_dt = 0.0, 0.02
     for payload in _recv_delimited(news):
         try:
-            sentiment_str, sent_ts = payload.decode("utf-8").split(",")
+            sentiment_str, sent_ts = str(payload, "utf-8").split(",")
             sentiment = int(sentiment_str); sent_ts_ms = int(sent_ts)
         except Exception: continue
 
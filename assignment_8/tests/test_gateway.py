@@ -0,0 +1,99 @@
+from gateway import load_recording
+
+def test_replay_recording_is_forward_filled_snapshots(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text(
+        "timestamp,symbol,price\n"
+        "2024-01-01 00:00:02,MSFT,201.0\n"
+        "2024-01-01 00:00:01,AAPL,101.0\n"
+        "2024-01-01 00:00:02,AAPL,102.0\n"
+        "2024-01-01 00:00:02,GOOG,999.0\n"
+        "2024-01-01 00:00:03,MSFT,203.0\n"
+    )
+    # MSFT has no price before its first trade, so its first recorded price is used
+    assert load_recording(path, ["AAPL", "MSFT"]).tolist() == [
+        [101.0, 201.0], [102.0, 201.0], [102.0, 203.0]]
+
+def test_fanout_conflates_stalled_subscriber_without_breaking_frames():
+    import socket, time
+    from gateway import _FanOut
+    fan = _FanOut("127.0.0.1", 0, "Test", max_pending=1 << 16, verbose=False)
+    subs = []
+    for _ in range(2):
+        c = socket.socket()
+        c.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        c.connect(("127.0.0.1", fan.port))
+        while len(fan.clients) <= len(subs):
+            fan.poll(0.01)
+        subs.append(c)
+    stalled, live = subs
+    for s in fan.clients:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+    live.setblocking(False)
+    live_cl = next(cl for cl in fan.clients.values() if cl.addr == live.getsockname())
+
+    def read(sock, buf):
+        try:
+            while True:
+                data = sock.recv(1 << 16)
+                if not data: return
+                buf += data
+        except BlockingIOError:
+            pass
+
+    n, size, got_live, saw_partial = 300, 20003, bytearray(), False
+    frame = lambda i: b"%06d|" % i + b"x" * (size - 8) + b"*"  # larger than the socket buffers: sent in pieces
+    for i in range(n):
+        fan.broadcast(frame(i))
+        saw_partial |= any(cl.partial for cl in fan.clients.values())
+        while live_cl.out:  # a reader that keeps up: drained before the next tick
+            read(live, got_live)
+            fan.poll(0.01)
+        read(live, got_live)
+    conflated = max(cl.conflated for cl in fan.clients.values())
+    assert conflated > 0 and live_cl.conflated == 0 and saw_partial
+
+    # the stalled reader wakes up: everything it gets is whole frames, in order, ending with the latest
+    stalled.setblocking(False)
+    got_stalled, deadline = bytearray(), time.time() + 5
+    while time.time() < deadline and not got_stalled.endswith(frame(n - 1)):
+        fan.poll(0.01)
+        read(stalled, got_stalled)
+    while time.time() < deadline and len(got_live) < n * size:
+        fan.poll(0.01)
+        read(live, got_live)
+    for got in (got_stalled, got_live):
+        frames = bytes(got).split(b"*")[:-1]
+        assert all(f + b"*" == frame(int(f[:6])) for f in frames)
+        ids = [int(f[:6]) for f in frames]
+        assert ids == sorted(set(ids)) and ids[-1] == n - 1
+    assert len(bytes(got_live).split(b"*")[:-1]) == n  # the live subscriber got every frame
+    assert len(bytes(got_stalled).split(b"*")[:-1]) == n - conflated
+    for c in subs: c.close()
+    fan.close()
+
+def test_serve_pacing_policies_after_a_stall():
+    import time
+    from gateway import _FanOut, _serve
+    fan = _FanOut("127.0.0.1", 0, "Test", verbose=False)
+    try:
+        for policy in ("skip", "catch_up"):
+            stamps = []
+            def on_tick(now_ms, msg, clients):
+                stamps.append(time.perf_counter())
+                if len(stamps) == 5:
+                    time.sleep(0.05)  # ~5 periods late at 100 Hz
+            n, skipped = _serve(fan, 100, lambda now_ms: b"x\n", on_tick, policy=policy, max_ticks=20)
+            gaps = [b - a for a, b in zip(stamps[5:], stamps[6:])]
+            if policy == "skip":
+                # missed deadlines are dropped and the schedule resumes at the normal period
+                assert n == 20 and skipped > 0 and min(gaps) > 0.005
+            else:
+                # every missed tick is still sent, back-to-back right after the stall
+                assert (n, skipped) == (20, 0) and min(gaps) < 0.005
+        # burst mode: no pacing at all
+        t0 = time.perf_counter()
+        assert _serve(fan, 0, lambda now_ms: b"x\n", max_ticks=2000) == (2000, 0)
+        assert time.perf_counter() - t0 < 1.0
+    finally:
+        fan.close()
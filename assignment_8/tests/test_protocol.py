@@ -0,0 +1,39 @@
+from framing import FrameReader
+from shared_memory_utils import SharedPriceBook
+from protocol import encode_ticks, decode_ticks, FRAME_HDR
+from orderbook import _drain_binary, _drain_text
+
+SYMBOLS = ["AAPL", "MSFT"]
+
+def test_binary_frames_round_trip_and_split_reads():
+    frame = encode_ticks([101.5, 202.25], 1700000000000)
+    rec = decode_ticks(frame[FRAME_HDR.size:])
+    assert rec["sym"].tolist() == [0, 1]
+    assert rec["price"].tolist() == [101.5, 202.25]
+    assert rec["ts"].tolist() == [1700000000000] * 2
+
+    book = SharedPriceBook(SYMBOLS, create=True)
+    try:
+        data = frame + encode_ticks([103.0, 204.0], 1700000000001)
+        # a frame cut mid-way stays buffered until the rest arrives
+        reader = FrameReader()
+        reader.feed(data[:len(frame) + 7])
+        assert _drain_binary(reader, book) == 2 and reader.pending() == 7
+        assert book.read_all() == {"AAPL": 101.5, "MSFT": 202.25}
+        reader.feed(data[len(frame) + 7:])
+        assert _drain_binary(reader, book) == 2 and reader.pending() == 0
+        assert book.read_all() == {"AAPL": 103.0, "MSFT": 204.0}
+        reader = FrameReader()
+        reader.feed(b"AAPL,1.5,1*MSFT,2.5,1*AAPL,3")
+        assert _drain_text(reader, book) == 2 and reader.pending() == 6 and book.read("MSFT") == 2.5
+    finally:
+        book.close(); book.unlink()
+
+def test_frame_reader_reassembles_and_grows():
+    msgs = [b"x" * n for n in (1, 5, 300, 40, 2, 1000)]
+    data = b"".join(m + b"*" for m in msgs)
+    reader, got = FrameReader(size=64), []
+    for i in range(0, len(data), 37):
+        reader.feed(data[i:i + 37])
+        got += [bytes(m) for m in reader.delimited(b"*")]
+    assert got == msgs and reader.pending() == 0